@@ -88,19 +88,7 @@ async function startRecording() {
                 const formData = new FormData();
                 formData.append("file", file);
 
-                const response = await fetch("https://bytebypython.onrender.com/process-speech", {
-                    method: "POST",
-                    headers: {
-                        'Authorization': `Bearer ${localStorage.getItem('access_token')}`
-                    },
-                    body: formData
-                });
-
-                if (!response.ok) {
-                    throw new Error("Failed to process voice file.");
-                }
-
-                const data = await response.json();
+                const data = await transcribeVoice(formData);
                 const transcription = data.transcription;
 
                 // Update description box with transcription
@@ -530,24 +518,48 @@ async function analyzeImage(file) {
 }
 
 
+// Starts a transcription job and long-polls until the transcript is ready
+async function transcribeVoice(formData) {
+    const headers = {
+        'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+    };
+
+    const response = await fetch("https://bytebypython.onrender.com/process-speech", {
+        method: "POST",
+        headers: headers,
+        body: formData
+    });
+
+    if (!response.ok) {
+        throw new Error("Failed to process voice file.");
+    }
+
+    const job = await response.json();
+    while (true) {
+        const jobResponse = await fetch(
+            `https://bytebypython.onrender.com/transcription-jobs/${job.job_id}?wait=25`,
+            { headers: headers }
+        );
+        if (!jobResponse.ok) {
+            throw new Error("Failed to fetch transcription.");
+        }
+
+        const data = await jobResponse.json();
+        if (data.status === 'completed') {
+            return data;
+        }
+        if (data.status === 'error') {
+            throw new Error(data.error || "Transcription failed.");
+        }
+    }
+}
+
 async function processVoice(file) {
     try {
         const formData = new FormData();
         formData.append("file", file);
 
-        const response = await fetch("https://bytebypython.onrender.com/process-speech", {
-            method: "POST",
-            headers: {
-                'Authorization': `Bearer ${localStorage.getItem('access_token')}`
-            },
-            body: formData
-        });
-
-        if (!response.ok) {
-            throw new Error("Failed to process voice file.");
-        }
-
-        const data = await response.json();
+        const data = await transcribeVoice(formData);
         const transcription = data.transcription;
 
         // Get the description box element
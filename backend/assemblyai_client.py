@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+
+class TranscriptionError(Exception):
+    """AssemblyAI rejected the upload or failed to transcribe it."""
+
+
+class TranscriptionTimeout(TranscriptionError):
+    """The transcript was not ready before the deadline."""
+
+
+class AssemblyAIClient:
+    """
+    Minimal async AssemblyAI v2 client on top of the shared HttpClient.
+
+    Polling adapts to the clip: the interval grows geometrically from
+    `min_poll_interval` up to `max_poll_interval`, and once AssemblyAI
+    reports the audio duration we don't poll much faster than a long clip can
+    possibly finish. Every wait is bounded by `timeout_seconds`.
+    """
+
+    def __init__(self, http_client, api_key, base_url="https://api.assemblyai.com/v2",
+                 timeout_seconds=180.0, min_poll_interval=0.5, max_poll_interval=5.0):
+        self.http_client = http_client
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout_seconds = timeout_seconds
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+
+        # Metrics
+        self.polls = 0
+        self.completed = 0
+        self.timed_out = 0
+
+    @property
+    def headers(self):
+        return {"authorization": self.api_key}
+
+    async def upload(self, data):
+        """
+        Upload audio and return AssemblyAI's private upload_url.
+        `data` may be bytes or an async iterator of chunks, which is streamed.
+        """
+        async with self.http_client.session.post(
+            f"{self.base_url}/upload", headers=self.headers, data=data
+        ) as response:
+            if response.status != 200:
+                raise TranscriptionError("Failed to upload audio file")
+            return (await response.json())["upload_url"]
+
+    async def submit(self, audio_url, language_code="en", **options):
+        """Start a transcription and return its id."""
+        payload = {"audio_url": audio_url, "language_code": language_code, **options}
+        async with self.http_client.session.post(
+            f"{self.base_url}/transcript", headers=self.headers, json=payload
+        ) as response:
+            if response.status != 200:
+                raise TranscriptionError("Failed to start transcription")
+            return (await response.json())["id"]
+
+    async def get_transcript(self, transcript_id):
+        async with self.http_client.session.get(
+            f"{self.base_url}/transcript/{transcript_id}", headers=self.headers
+        ) as response:
+            self.polls += 1
+            return await response.json()
+
+    def poll_delay(self, attempt, audio_duration=None):
+        """Seconds to wait before poll number `attempt` (0-based)."""
+        delay = self.min_poll_interval * (1.5 ** attempt)
+        if audio_duration:
+            # Transcription typically takes a fraction of real time; don't hammer long clips
+            delay = max(delay, audio_duration * 0.05)
+        return min(delay, self.max_poll_interval)
+
+    async def wait_for_transcript(self, transcript_id):
+        """Poll until the transcript completes and return it."""
+        deadline = time.monotonic() + self.timeout_seconds
+        audio_duration = None
+        attempt = 0
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.timed_out += 1
+                raise TranscriptionTimeout(f"Transcription not ready after {self.timeout_seconds} seconds")
+
+            await asyncio.sleep(min(self.poll_delay(attempt, audio_duration), remaining))
+            attempt += 1
+
+            result = await self.get_transcript(transcript_id)
+            if result["status"] == "completed":
+                self.completed += 1
+                return result
+            if result["status"] == "error":
+                raise TranscriptionError("Transcription failed: " + result.get("error", "Unknown error"))
+
+            # Continue polling if status is 'queued' or 'processing'
+            audio_duration = result.get("audio_duration") or audio_duration
+
+    async def transcribe(self, data, language_code="en"):
+        """Upload, transcribe and return the transcript text."""
+        upload_url = await self.upload(data)
+        transcript_id = await self.submit(upload_url, language_code)
+        result = await self.wait_for_transcript(transcript_id)
+        return result["text"]
+
+    def get_stats(self):
+        return {
+            "polls": self.polls,
+            "completed": self.completed,
+            "timed_out": self.timed_out,
+        }
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import uuid
+import aiohttp
+from fastapi import FastAPI, Request, HTTPException
+
+# Local stand-in for the parts of the AssemblyAI v2 API we use, including the
+# completion webhook. Point the app at it with
+#   ASSEMBLYAI_BASE_URL=http://127.0.0.1:8001/v2 PUBLIC_BASE_URL=http://127.0.0.1:8000 ASSEMBLYAI_WEBHOOK_SECRET=dev
+# and run: uvicorn backend.assemblyai_standin:app --port 8001
+
+STANDIN_TEXT = os.getenv("STANDIN_TRANSCRIPT_TEXT", "Someone is breaking into the car with a knife.")
+STANDIN_DELAY_SECONDS = float(os.getenv("STANDIN_DELAY_SECONDS", "2"))
+
+app = FastAPI()
+uploads = {}
+transcripts = {}
+tasks = set()
+
+
+@app.post("/v2/upload")
+async def upload(request: Request):
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+    upload_id = uuid.uuid4().hex
+    uploads[upload_id] = size
+    return {"upload_url": f"https://standin.invalid/upload/{upload_id}"}
+
+
+@app.post("/v2/transcript")
+async def create_transcript(request: Request):
+    body = await request.json()
+    transcript_id = uuid.uuid4().hex
+    transcripts[transcript_id] = {
+        "id": transcript_id,
+        "status": "queued",
+        "audio_url": body["audio_url"],
+        "language_code": body.get("language_code", "en"),
+        "text": None,
+    }
+    task = asyncio.create_task(_transcribe(transcript_id, body))
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    return transcripts[transcript_id]
+
+
+@app.get("/v2/transcript/{transcript_id}")
+async def get_transcript(transcript_id: str):
+    if transcript_id not in transcripts:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return transcripts[transcript_id]
+
+
+async def _transcribe(transcript_id, body):
+    transcript = transcripts[transcript_id]
+    transcript["status"] = "processing"
+    await asyncio.sleep(STANDIN_DELAY_SECONDS)
+    transcript.update(status="completed", text=STANDIN_TEXT, audio_duration=STANDIN_DELAY_SECONDS)
+
+    if body.get("webhook_url"):
+        headers = {}
+        if body.get("webhook_auth_header_name"):
+            headers[body["webhook_auth_header_name"]] = body.get("webhook_auth_header_value", "")
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                body["webhook_url"],
+                json={"transcript_id": transcript_id, "status": "completed"},
+                headers=headers
+            ) as response:
+                print(f"Webhook for {transcript_id} returned {response.status}")
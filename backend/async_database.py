@@ -0,0 +1,267 @@
+import threading
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.monitoring import ConnectionPoolListener
+from passlib.context import CryptContext
+from datetime import datetime
+from backend.config import settings
+from backend.ticket_numbers import TicketNumberAllocator
+from backend.password_hashing import PasswordHasher
+from backend.refresh_tokens import RefreshTokenStore
+import pytz
+
+
+class PoolStats(ConnectionPoolListener):
+    """Counts connection pool events across all servers the client talks to."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.connections_created = 0
+        self.check_outs = 0
+        self.check_out_failures = 0
+        self.pool_clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        # Includes timing out while every pooled connection was busy
+        with self._lock:
+            self.check_out_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.check_outs += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "connections_created": self.connections_created,
+                "check_outs": self.check_outs,
+                "check_out_failures": self.check_out_failures,
+                "pool_clears": self.pool_clears,
+            }
+
+
+class AsyncDatabase:
+    """
+    One Motor client (and so one connection pool) for the whole app. Create a
+    single instance at startup (see the lifespan in main.py) and close() it on
+    shutdown.
+
+    Every query is awaited so a slow one doesn't stall the event loop.
+    `sync_db` is a pymongo handle on the same client (and connection pool)
+    for startup maintenance that runs in a thread, such as index creation
+    and seeding.
+
+    bcrypt runs on `password_hasher`'s own thread pool; the synchronous
+    hash_password/verify_password are for code that is already off the loop.
+    """
+
+    def __init__(self):
+        # Initialize MongoDB client and collections
+        self.pool_stats = PoolStats()
+        self.client = AsyncIOMotorClient(
+            settings.MONGO_URI,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+            connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+            serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            heartbeatFrequencyMS=settings.MONGO_HEARTBEAT_FREQUENCY_MS,
+            event_listeners=[self.pool_stats]
+        )
+        self.db = self.client[settings.MONGO_DB_NAME]
+        self.sync_db = self.client.delegate[settings.MONGO_DB_NAME]
+        self.reports_collection = self.db.crime_reports
+        self.police_stations_collection = self.db.police_stations
+        self.users_collection = self.db.users
+        self.tickets_collection = self.db.tickets
+        self.ticket_numbers = TicketNumberAllocator(self.db.counters, settings.TICKET_NUMBER_BLOCK_SIZE)
+        self.refresh_tokens = RefreshTokenStore(
+            self.db.refresh_tokens, settings.SECRET_KEY, settings.REFRESH_TOKEN_EXPIRE_DAYS
+        )
+
+        # Password hashing context
+        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.password_hasher = PasswordHasher(
+            self.pwd_context,
+            workers=settings.PASSWORD_HASH_WORKERS,
+            max_pending=settings.PASSWORD_HASH_MAX_PENDING
+        )
+
+    def close(self):
+        self.client.close()
+        self.password_hasher.close()
+
+    def get_pool_stats(self):
+        return {
+            "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+            "min_pool_size": settings.MONGO_MIN_POOL_SIZE,
+            **self.pool_stats.get_stats(),
+        }
+
+    def hash_password(self, password):
+        """Hash a plain-text password."""
+        return self.pwd_context.hash(password)
+
+    def verify_password(self, plain_password, hashed_password):
+        """Verify a plain-text password against a hashed password."""
+        return self.pwd_context.verify(plain_password, hashed_password)
+
+    async def create_user(self, username, email, password, full_name=None):
+        """Create a new user in the database."""
+        # Get current time in IST
+        ist = pytz.timezone('Asia/Kolkata')
+        current_time = datetime.now(ist)
+        existing_user = await self.users_collection.find_one({
+            "$or": [
+                {"username": username},
+                {"email": email}
+            ]
+        })
+        if existing_user:
+            raise ValueError("Username or email already exists")
+
+        user_doc = {
+            "username": username,
+            "email": email,
+            "full_name": full_name,
+            "hashed_password": await self.password_hasher.hash(password),
+            "created_at": current_time,
+            "is_active": True
+        }
+
+        result = await self.users_collection.insert_one(user_doc)
+        return str(result.inserted_id)
+
+    async def authenticate_user(self, username: str, password: str):
+        """Authenticate a user by username and password."""
+        user = await self.users_collection.find_one({"username": username})
+        if not user or not await self.password_hasher.verify(password, user['hashed_password']):
+            return None
+        return user
+
+    async def authenticate_police_station(self, username: str, password: str):
+        """Authenticate a police station by username and password."""
+        station = await self.police_stations_collection.find_one({"username": username})
+        if not station or not await self.password_hasher.verify(password, station['hashed_password']):
+            return None
+        return station
+
+    async def get_police_station_tickets(self, police_station):
+        """Retrieve tickets for a specific police station."""
+        return await self.tickets_collection.find({"police_station": police_station}).to_list(None)
+
+    async def update_ticket_status(self, ticket_number: str, new_status: str):
+        """
+        Update the status of a ticket and record the timestamp of the update.
+        Returns True if a ticket was updated.
+        """
+        # Get current time in IST
+        ist = pytz.timezone('Asia/Kolkata')
+        current_time = datetime.now(ist)
+
+        result = await self.tickets_collection.update_one(
+            {"ticket_number": ticket_number},
+            {
+                "$set": {
+                    "status": new_status,
+                    "updated_at": current_time  # Will be set only when status is updated
+                }
+            }
+        )
+        return result.modified_count > 0
+
+    async def create_ticket(self, user_name, pincode, crime_type,
+                            police_station=None, description=None, ticket_number=None,
+                            image_url=None, audio_url=None):
+        """Create a new ticket in the database."""
+        # Get current time in IST
+        ist = pytz.timezone('Asia/Kolkata')
+        current_time = datetime.now(ist)
+        # If no ticket number is provided, allocate the next one
+        if not ticket_number:
+            ticket_number = await self.ticket_numbers.next()
+
+        # Retrieve the user document
+        user = await self.users_collection.find_one({"username": user_name})
+        if not user:
+            raise ValueError(f"User {user_name} not found")
+
+        # If police station is provided, make sure it exists
+        if police_station:
+            station = await self.police_stations_collection.find_one({"name": police_station}, {"_id": 1})
+            if not station:
+                raise ValueError(f"Police station {police_station} not found")
+
+        ticket = {
+            "ticket_number": ticket_number,
+            "user_name": user_name,
+            "pincode": pincode,
+            "phone_number": user["phone_number"],
+            "crime_type": crime_type,
+            "police_station": police_station,
+            "description": description,
+            "image_url": image_url or None,
+            "audio_url": audio_url or None,
+            "status": "New",  # Initial status
+            "created_at": current_time,  # Creation timestamp
+            "updated_at": None   # Initial update timestamp is null.
+        }
+
+        result = await self.tickets_collection.insert_one(ticket)
+        return result.inserted_id
+
+    async def insert_police_station(self, police_station):
+        """Insert a new police station into the database."""
+        result = await self.police_stations_collection.insert_one(police_station.dict(by_alias=True))
+        return str(result.inserted_id)
+
+    async def reset_password(self, email: str, new_password: str):
+        """Reset a user's password."""
+        new_hashed_password = await self.password_hasher.hash(new_password)
+
+        result = await self.users_collection.update_one(
+            {"email": email},
+            {"$set": {"hashed_password": new_hashed_password}}
+        )
+
+        return result.modified_count > 0
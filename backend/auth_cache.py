@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PrincipalCache:
+    """
+    Bounded LRU of authenticated principals, keyed by (kind, token).
+
+    A token is only cached after its signature and expiry have been checked
+    and its user or station document loaded, so a hit skips both the JWT
+    decode and the Mongo lookup. Entries live for `ttl_seconds` at most and
+    never past the token's own `exp`.
+
+    `invalidate(kind, subject)` drops every cached token of one account (on
+    password reset and similar changes). That only reaches this process;
+    other workers pick up the change once their entries expire, so keep
+    `ttl_seconds` short.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # (kind, token) -> (principal, subject, expires_at)
+        self._tokens_by_subject = {}  # (kind, subject) -> {token, ...}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, kind, token):
+        key = (kind, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, subject, expires_at = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def set(self, kind, token, subject, principal, token_expires_at=None):
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        key = (kind, token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (principal, subject, expires_at)
+            self._tokens_by_subject.setdefault((kind, subject), set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, kind, subject):
+        with self._lock:
+            for token in self._tokens_by_subject.pop((kind, subject), ()):
+                self._entries.pop((kind, token), None)
+            self.invalidations += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        subject_key = (key[0], entry[1])
+        tokens = self._tokens_by_subject.get(subject_key)
+        if tokens is not None:
+            tokens.discard(key[1])
+            if not tokens:
+                del self._tokens_by_subject[subject_key]
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
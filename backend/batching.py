@@ -0,0 +1,181 @@
+import asyncio
+import time
+
+
+class BatchingScheduler:
+    """
+    Collects concurrent requests into micro-batches.
+
+    Callers `await submit(item)`. A background task waits for the first item,
+    then keeps collecting until `max_batch_size` items are queued or
+    `max_wait_ms` has passed, runs `run_batch(items)` once in `executor`
+    (the default thread pool when None) and hands each caller its own result.
+    `run_batch` must return one result per item, in order. Up to
+    `max_concurrent_batches` batches run at the same time, so an executor
+    with several workers is kept busy.
+    """
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait_ms=10, executor=None,
+                 max_concurrent_batches=1):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0, max_wait_ms)
+        self.executor = executor
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self._queue = None
+        self._worker = None
+        self._slots = None
+        self._running = set()
+
+        # Metrics
+        self.batch_size_histogram = {}
+        self.max_queue_depth = 0
+        self.batches_run = 0
+        self.items_processed = 0
+        self.failed_batches = 0
+        self.total_batch_seconds = 0.0
+
+    async def start(self):
+        """Start the background batching task on the running event loop."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        """Stop the batching task and fail anything still waiting."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batching scheduler stopped"))
+
+    async def submit(self, item):
+        """Queue one item and wait for its result."""
+        if self._worker is None:
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def run(self, fn, *args):
+        """
+        Run one non-batched job, `fn(*args)`, in the executor on a batch slot,
+        so it shares the executor's capacity with batches. The slot is held
+        until `fn` actually returns, even if the caller stops waiting.
+        """
+        if self._worker is None:
+            await self.start()
+
+        await self._slots.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.shield(future)
+
+    async def _collect_batch(self, first):
+        loop = asyncio.get_running_loop()
+        batch = [first]
+        deadline = loop.time() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Callers that gave up (timeouts, disconnects) don't need a forward pass
+        return [(item, future) for item, future in batch if not future.done()]
+
+    async def _batch_loop(self):
+        while True:
+            # Block until there is at least one request, then wait for a free slot before
+            # collecting the rest, so batches keep filling while all slots are busy. Idle,
+            # the loop holds no slot, so jobs passed to `run` aren't starved.
+            first = await self._queue.get()
+            try:
+                await self._slots.acquire()
+            except BaseException:
+                self._queue.put_nowait(first)
+                raise
+            try:
+                batch = await self._collect_batch(first)
+            except BaseException:
+                self._slots.release()
+                raise
+            if not batch:
+                self._slots.release()
+                continue
+
+            task = asyncio.create_task(self._process_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _process_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+        size = len(items)
+        self.batch_size_histogram[size] = self.batch_size_histogram.get(size, 0) + 1
+        self.batches_run += 1
+        self.items_processed += size
+
+        started = time.perf_counter()
+        try:
+            results = await loop.run_in_executor(self.executor, self._run_batch, items)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            self.failed_batches += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.total_batch_seconds += time.perf_counter() - started
+            self._slots.release()
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self):
+        """Queue depth and batch-size histogram."""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "running_batches": len(self._running),
+            "max_queue_depth": self.max_queue_depth,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "failed_batches": self.failed_batches,
+            "average_batch_seconds": (
+                round(self.total_batch_seconds / self.batches_run, 4) if self.batches_run else None
+            ),
+            "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+        }
@@ -6,6 +6,15 @@ class Settings(BaseSettings):
     # MongoDB settings
     MONGO_URI: str
     MONGO_DB_NAME: str = "cap_database"
+    MONGO_MAX_POOL_SIZE: int = 50  # Connections per server; size to concurrent requests
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 300000  # Close pooled connections idle this long
+    MONGO_CONNECT_TIMEOUT_MS: int = 10000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 10000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000  # Fail instead of queueing forever when the pool is exhausted
+    MONGO_HEARTBEAT_FREQUENCY_MS: int = 10000
+    INDEX_REPORT_CACHE_SECONDS: int = 300  # How long /metrics reuses the index report ($indexStats)
+    TICKET_NUMBER_BLOCK_SIZE: int = 20  # Ticket numbers each worker reserves per counter update
     ASSEMBLY_API_KEY: str = Field(..., env="ASSEMBLY_API_KEY")
     GEMINI_API_KEY: str = Field(..., env="GEMINI_API_KEY")
     FOLDER_ID: str = Field(..., env="FOLDER_ID")
@@ -14,10 +23,29 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14  # Refresh tokens rotate on use; a session idle this long must log in again
+    AUTH_CACHE_MAX_ENTRIES: int = 10000  # Resolved tokens kept per worker
+    AUTH_CACHE_TTL_SECONDS: int = 60  # Bounds how long other workers may serve a changed account
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt threads per worker process
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Queued + running hashes before auth answers 503
 
     # Email settings for OTP
     SENDER_EMAIL: Optional[str] = None
     SENDER_PASSWORD: Optional[str] = None
+    OTP_TTL_SECONDS: int = 300  # How long a sent OTP can be verified
+    OTP_MAX_ATTEMPTS: int = 3  # Wrong guesses before the OTP is discarded
+    OTP_RESEND_SECONDS: int = 60  # Minimum gap between OTP emails to one address
+    OTP_VERIFIED_TTL_SECONDS: int = 600  # Window for resetting the password after verifying
+
+    # Shared short-lived state (OTPs, rate limits)
+    TTL_STORE_BACKEND: str = "sqlite"  # "sqlite" is shared by all workers on the host; "memory" is per worker
+    TTL_STORE_PATH: str = "cache/ttl_store.sqlite3"
+    TTL_STORE_SWEEP_SECONDS: int = 60  # How often expired entries are deleted
+
+    # Request rate limiting (token buckets, per worker)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_BUCKETS: int = 100000  # Least recently used buckets are dropped beyond this
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # Key clients by X-Forwarded-For; only behind a trusted proxy
 
     # SMTP settings
     SMTP_EMAIL: str
@@ -34,6 +62,64 @@ class Settings(BaseSettings):
       # Optional extra settings for development
     DEV_MODE: Optional[bool] = False  # For development mode if needed
 
+    # Crime detection model settings
+    WARM_UP_MODELS: bool = True  # Load and warm the YOLOS detector at startup
+    BATCH_MAX_SIZE: int = 8  # Max images per batched forward pass
+    BATCH_MAX_WAIT_MS: int = 10  # Max time to wait for a batch to fill up
+    INFERENCE_WORKERS: int = 1  # Detector processes; 0 runs the model in-process on a thread
+    INFERENCE_QUEUE_SIZE: int = 16  # Waiting/running requests allowed per worker
+    INFERENCE_TIMEOUT_SECONDS: float = 30.0  # Per-request limit before degrading
+    INFERENCE_TORCH_THREADS: int = 0  # torch threads per worker; 0 keeps torch's default
+    INFERENCE_BACKEND: str = "eager"  # eager, torchscript, int8 or onnx (needs onnxruntime)
+    INFERENCE_EXPORT_DIR: str = "model_exports"  # Where TorchScript/ONNX exports are cached
+    INFERENCE_IMAGE_HEIGHT: int = 0  # Fixed model input size; 0 keeps the processor's resizing
+    INFERENCE_IMAGE_WIDTH: int = 0  # (torchscript/onnx default to 512x768 when unset)
+    DETECTION_SCORE_THRESHOLD: float = 0.7  # Minimum class probability for a detection
+    DETECTION_NMS_IOU: float = 0.0  # Per-label NMS IoU threshold; 0 disables NMS
+    MAX_IMAGE_UPLOAD_BYTES: int = 20 * 1024 * 1024  # Uploads above this are rejected unread
+    MAX_IMAGE_PIXELS: int = 50_000_000  # Checked from the header, before decoding
+
+    # Video evidence analysis
+    MAX_VIDEO_UPLOAD_BYTES: int = 200 * 1024 * 1024
+    VIDEO_TIMEOUT_SECONDS: float = 120.0
+    VIDEO_MAX_FRAMES: int = 120  # Max sampled frames run through the detector per clip
+    VIDEO_SCENE_CHANGE_THRESHOLD: float = 0.12  # Mean thumbnail difference (0..1) that counts as a new scene
+    VIDEO_MIN_SAMPLE_INTERVAL_SECONDS: float = 0.5
+    VIDEO_MAX_SAMPLE_INTERVAL_SECONDS: float = 5.0
+    VIDEO_EARLY_EXIT_CRIME: str = "Armed Threat"  # Stop decoding once this crime is detected...
+    VIDEO_EARLY_EXIT_SCORE: float = 0.9  # ...by a detection at least this confident
+
+    # Image analysis result cache
+    IMAGE_CACHE_ENABLED: bool = True
+    IMAGE_CACHE_MAX_ENTRIES: int = 4096
+    IMAGE_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    IMAGE_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    IMAGE_CACHE_DISK_PATH: Optional[str] = None  # e.g. "cache/results.sqlite3" to survive restarts
+    IMAGE_CACHE_DISK_MAX_BYTES: int = 256 * 1024 * 1024  # Soonest-expiring rows are pruned beyond this
+    IMAGE_CACHE_PERCEPTUAL_HASH: bool = True  # Also match near-identical re-encodes
+
+    # Outbound HTTP / AssemblyAI transcription
+    MAX_AUDIO_UPLOAD_BYTES: int = 100 * 1024 * 1024  # Enforced while streaming to AssemblyAI
+    ASSEMBLYAI_BASE_URL: str = "https://api.assemblyai.com/v2"
+    HTTP_POOL_SIZE: int = 100  # Total pooled connections for outbound API calls
+    HTTP_POOL_SIZE_PER_HOST: int = 20
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    TRANSCRIPTION_TIMEOUT_SECONDS: float = 180.0  # Give up waiting for a transcript after this
+    TRANSCRIPTION_MIN_POLL_SECONDS: float = 0.5  # First poll interval, grows 1.5x per poll...
+    TRANSCRIPTION_MAX_POLL_SECONDS: float = 5.0  # ...up to this
+    PUBLIC_BASE_URL: Optional[str] = None  # e.g. "https://bytebypython.onrender.com"; enables the AssemblyAI webhook
+    ASSEMBLYAI_WEBHOOK_SECRET: Optional[str] = None  # Required with PUBLIC_BASE_URL; shared by all workers
+    TRANSCRIPTION_WEBHOOK_FALLBACK_SECONDS: float = 60.0  # Poll a job whose webhook hasn't arrived after this
+    TRANSCRIPTION_JOB_TTL_SECONDS: int = 3600  # How long finished jobs stay fetchable
+
+    # Transcription cache (keyed by audio SHA-256 + language)
+    TRANSCRIPTION_CACHE_ENABLED: bool = True
+    TRANSCRIPTION_CACHE_MAX_ENTRIES: int = 2048
+    TRANSCRIPTION_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    TRANSCRIPTION_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    TRANSCRIPTION_CACHE_DISK_PATH: Optional[str] = "cache/transcriptions.sqlite3"  # None keeps it in memory only
+    TRANSCRIPTION_CACHE_DISK_MAX_BYTES: int = 64 * 1024 * 1024
+
     # Configuration for reading the .env file
     model_config = SettingsConfigDict(
         env_file=".env",
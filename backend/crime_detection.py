@@ -1,155 +1,244 @@
 import os
-import torch
-from PIL import Image
-import io
-import numpy as np
 from transformers import YolosImageProcessor, YolosForObjectDetection
+from backend.model_registry import ModelRegistry
+from backend.crime_index import CrimeKeywordIndex
+from backend.inference_backends import create_backend, DEFAULT_EXPORT_SIZE
+from backend.image_preprocessing import ImagePreprocessor
+from backend.detections import post_process
+from backend.config import settings
 
 # Suppress HuggingFace symlink warnings
 os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
 
+# Enhanced and more specific crime-related keywords mapping
+CRIME_KEYWORDS = {
+    # Pickpocketing Specific Detection
+    'wallet': 'Pickpocketing',
+    'backpack': 'Pickpocketing',
+    'purse': 'Pickpocketing',
+    'hand near pocket': 'Pickpocketing',
+    'crowded area': 'Pickpocketing',
+    
+    # Shoplifting Specific Detection
+    'clothing': 'Shoplifting',
+    'merchandise': 'Shoplifting',
+    'bag': 'Shoplifting',
+    'shelf': 'Shoplifting',
+    'store interior': 'Shoplifting',
+    
+    # Breaking and Entering Specific Detection
+    'window': 'Breaking and Entering',
+    'door': 'Breaking and Entering',
+    'crowbar': 'Breaking and Entering',
+    'glass break': 'Breaking and Entering',
+    'ladder': 'Breaking and Entering',
+    
+    # Vehicle-related
+    'car': 'Vehicle Theft',
+    'truck': 'Vehicle Theft',
+    'motorcycle': 'Vehicle Theft',
+    'bicycle': 'Bicycle Theft',
+
+    # Suspicious Activities
+    'person': 'Suspicious Activity',
+    'mask': 'Attempted Robbery',
+    'gloves': 'Suspicious Activity',
+    'ski mask': 'Attempted Robbery',
+
+    # Potential Weapons
+    'knife': 'Armed Threat',
+    'gun': 'Armed Threat',
+    'weapon': 'Armed Threat'
+}
+
+# Additional context-based crime detection rules
+CRIME_CONTEXT_RULES = {
+    'Pickpocketing': {
+        'keywords': ['crowded', 'wallet', 'hand near pocket'],
+        'confidence_threshold': 0.6
+    },
+    'Shoplifting': {
+        'keywords': ['store', 'merchandise', 'concealing'],
+        'confidence_threshold': 0.7
+    },
+    'Breaking and Entering': {
+        'keywords': ['window', 'door', 'broken glass'],
+        'confidence_threshold': 0.65
+    }
+}
+
 class CrimeDetector:
-    def __init__(self):
+    def __init__(self, backend=None, input_size=None):
         # Initialize YOLOS object detection model
         self.feature_extractor = YolosImageProcessor.from_pretrained('hustvl/yolos-small')
         self.model = YolosForObjectDetection.from_pretrained('hustvl/yolos-small')
 
-        # Enhanced and more specific crime-related keywords mapping
-        self.crime_keywords = {
-            # Pickpocketing Specific Detection
-            'wallet': 'Pickpocketing',
-            'backpack': 'Pickpocketing',
-            'purse': 'Pickpocketing',
-            'hand near pocket': 'Pickpocketing',
-            'crowded area': 'Pickpocketing',
-            
-            # Shoplifting Specific Detection
-            'clothing': 'Shoplifting',
-            'merchandise': 'Shoplifting',
-            'bag': 'Shoplifting',
-            'shelf': 'Shoplifting',
-            'store interior': 'Shoplifting',
-            
-            # Breaking and Entering Specific Detection
-            'window': 'Breaking and Entering',
-            'door': 'Breaking and Entering',
-            'crowbar': 'Breaking and Entering',
-            'glass break': 'Breaking and Entering',
-            'ladder': 'Breaking and Entering',
-            
-            # Vehicle-related
-            'car': 'Vehicle Theft',
-            'truck': 'Vehicle Theft',
-            'motorcycle': 'Vehicle Theft',
-            'bicycle': 'Bicycle Theft',
-
-            # Suspicious Activities
-            'person': 'Suspicious Activity',
-            'mask': 'Attempted Robbery',
-            'gloves': 'Suspicious Activity',
-            'ski mask': 'Attempted Robbery',
-
-            # Potential Weapons
-            'knife': 'Armed Threat',
-            'gun': 'Armed Threat',
-            'weapon': 'Armed Threat'
-        }
-
-        # Additional context-based crime detection rules
-        self.crime_context_rules = {
-            'Pickpocketing': {
-                'keywords': ['crowded', 'wallet', 'hand near pocket'],
-                'confidence_threshold': 0.6
-            },
-            'Shoplifting': {
-                'keywords': ['store', 'merchandise', 'concealing'],
-                'confidence_threshold': 0.7
-            },
-            'Breaking and Entering': {
-                'keywords': ['window', 'door', 'broken glass'],
-                'confidence_threshold': 0.65
-            }
-        }
+        # Fixed (height, width) model input, or None for the processor's own resizing
+        backend = backend or settings.INFERENCE_BACKEND
+        if input_size is None and settings.INFERENCE_IMAGE_HEIGHT and settings.INFERENCE_IMAGE_WIDTH:
+            input_size = (settings.INFERENCE_IMAGE_HEIGHT, settings.INFERENCE_IMAGE_WIDTH)
+        if input_size is None and backend in ("torchscript", "onnx"):
+            # Exported graphs only accept the size they were built for
+            input_size = DEFAULT_EXPORT_SIZE
+        self.input_size = input_size
+
+        # Eager PyTorch, TorchScript, dynamic int8 or ONNX Runtime
+        self.backend = create_backend(
+            backend,
+            self.model,
+            input_size=self.input_size,
+            export_dir=settings.INFERENCE_EXPORT_DIR,
+            threads=settings.INFERENCE_TORCH_THREADS
+        )
+
+        # Decodes uploads directly at the model's input size into reused buffers
+        self.preprocessor = ImagePreprocessor.from_processor(
+            self.feature_extractor,
+            input_size=self.input_size,
+            max_bytes=settings.MAX_IMAGE_UPLOAD_BYTES,
+            max_pixels=settings.MAX_IMAGE_PIXELS
+        )
+
+        # Crime keyword tables, compiled once against every label the model can emit
+        self.crime_keywords = CRIME_KEYWORDS
+        self.crime_context_rules = CRIME_CONTEXT_RULES
+        self.keyword_index = CrimeKeywordIndex(self.crime_keywords, self.crime_context_rules)
+        self.keyword_index.compile_labels(self.model.config.id2label.values())
 
     def detect_crime(self, image_bytes):
         """
         Analyze the uploaded image and extract crime-related keywords and type.
         """
-        try:
-            # Convert bytes to PIL Image
-            image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+        return self.detect_crime_batch([image_bytes])[0]
+
+    def detect_crime_batch(self, images_bytes):
+        """
+        Analyze several uploaded images with a single forward pass.
+        Returns one result per input, in the same order.
+        """
+        results = [None] * len(images_bytes)
+
+        # Decode at model input size; an undecodable or oversized upload only fails its own slot
+        images = []
+        positions = []
+        for position, image_bytes in enumerate(images_bytes):
+            try:
+                images.append(self.preprocessor.load(image_bytes))
+                positions.append(position)
+            except Exception as e:
+                print(f"Error in crime detection: {e}")
+                results[position] = self._failed_result("invalid_image")
+
+        for position, result in zip(positions, self.detect_crime_images(images)):
+            results[position] = result
 
+        return results
+
+    def detect_crime_images(self, images):
+        """
+        Analyze already decoded PIL images (e.g. video frames) with a single forward pass.
+        """
+        results = [None] * len(images)
+
+        # YOLOS has no pixel mask, so padding would leak into other images' logits:
+        # only images with the same input size share a forward pass
+        groups = {}
+        for position, image in enumerate(images):
+            image = self.preprocessor.fit(image)
+            groups.setdefault(image.size, []).append((position, image))
+
+        for group in groups.values():
+            for (position, _), result in zip(group, self._detect_same_size([image for _, image in group])):
+                results[position] = result
+        return results
+
+    def _detect_same_size(self, images):
+        try:
             # Prepare inputs
-            inputs = self.feature_extractor(images=image, return_tensors="pt")
+            pixel_values = self.preprocess(images)
 
             # Run object detection
-            with torch.no_grad():
-                outputs = self.model(**inputs)
+            logits, pred_boxes = self.backend(pixel_values)
 
             # Process results
-            probas = outputs.logits.softmax(-1)[0, :, :-1]
-            keep = probas.max(-1).values > 0.7
-
-            # Extract detected objects
-            detected_objects = [self.model.config.id2label[p.argmax().item()].lower() for p in probas[keep]]
-
-            # Generate more comprehensive keywords
-            keywords = list(set(detected_objects))
-
-            # Map detected objects to crime types
-            crime_types = []
-            for obj in keywords:
-                # Check for exact and partial matches
-                matching_crimes = [
-                    self.crime_keywords.get(key, 'Suspicious Activity')
-                    for key in self.crime_keywords.keys()
-                    if key in obj
-                ]
-                crime_types.extend(matching_crimes)
-
-            # Context-based crime type detection
-            context_crime_type = self._detect_crime_by_context(keywords)
-
-            # Prioritize most serious crime type
-            if context_crime_type:
-                crime_type = context_crime_type
-            else:
-                crime_type = max(set(crime_types), key=crime_types.count) if crime_types else 'Unspecified Crime'
-
-            return {
-                'keywords': keywords,
-                'crime_type': crime_type
-            }
+            return [self._classify_detections(detections) for detections in self.post_process(logits, pred_boxes)]
 
         except Exception as e:
             print(f"Error in crime detection: {e}")
-            return {
-                'keywords': [],
-                'crime_type': 'Unspecified Crime'
-            }
+            return [self._failed_result("error") for _ in images]
+
+    def preprocess(self, images):
+        """
+        Normalize same-size PIL images into a pixel_values batch.
+        """
+        return self.preprocessor.to_batch(images)
+
+    def post_process(self, logits, pred_boxes):
+        """
+        Labels, scores and boxes for every image in the batch, above the score threshold.
+        """
+        return post_process(
+            logits,
+            pred_boxes,
+            self.model.config.id2label,
+            threshold=settings.DETECTION_SCORE_THRESHOLD,
+            nms_iou=settings.DETECTION_NMS_IOU or None
+        )
+
+    def _classify_detections(self, detections):
+        """
+        Turn the detections of one image into keywords and a crime type.
+        """
+        # Highest model score per detected object label
+        label_scores = detections.label_scores()
+        keywords = list(label_scores)
+
+        # Context rules (scored with model confidences) first, then the most common mapped crime type
+        crime_type = self.keyword_index.classify(label_scores)
+
+        return {
+            'keywords': keywords,
+            'crime_type': crime_type,
+            'detections': detections.to_list()
+        }
+
+    def _unspecified_result(self):
+        return {
+            'keywords': [],
+            'crime_type': 'Unspecified Crime',
+            'detections': []
+        }
+
+    def _failed_result(self, reason):
+        """
+        Stand-in for an image the model couldn't analyze. Marked degraded so
+        callers don't cache it like a real 'Unspecified Crime' verdict.
+        """
+        return {**self._unspecified_result(), 'degraded': True, 'reason': reason}
 
     def _detect_crime_by_context(self, detected_keywords):
         """
         Detect crime type based on context and keyword combinations
         """
-        for crime_type, rules in self.crime_context_rules.items():
-            context_keywords = rules['keywords']
-            
-            # Check if sufficient context keywords are present
-            matching_keywords = [kw for kw in context_keywords if 
-                                 any(kw in keyword for keyword in detected_keywords)]
-            
-            # If enough context keywords match, return the crime type
-            if len(matching_keywords) >= len(context_keywords) * rules['confidence_threshold']:
-                return crime_type
-        
-        return None
+        return self.keyword_index.context_crime_type(detected_keywords)
+
+# Keyword index for free text (e.g. transcribed voice descriptions); needs no model
+text_keyword_index = CrimeKeywordIndex(CRIME_KEYWORDS, CRIME_CONTEXT_RULES)
+
+# One warm detector per process, shared by every request
+model_registry = ModelRegistry(CrimeDetector)
+
+def detect_crime_batch(images_bytes):
+    """
+    Run a batch of images through the shared detector.
+    """
+    return model_registry.get_detector().detect_crime_batch(images_bytes)
 
 def analyze_image(image_bytes):
     """
     Wrapper function for crime detection.
     """
-    detector = CrimeDetector()
+    detector = model_registry.get_detector()
     result = detector.detect_crime(image_bytes)
     return result['keywords']
 
@@ -157,5 +246,5 @@ def analyze_image_detailed(image_bytes):
     """
     Detailed crime detection returning both keywords and crime type.
     """
-    detector = CrimeDetector()
-    return detector.detect_crime(image_bytes)
\ No newline at end of file
+    detector = model_registry.get_detector()
+    return detector.detect_crime(image_bytes)
@@ -0,0 +1,151 @@
+from collections import Counter, deque
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed keyword set.
+    Finds every (possibly overlapping) keyword occurrence in one pass over the text.
+    """
+
+    def __init__(self, keywords):
+        self._transitions = [{}]
+        self._failure = [0]
+        self._outputs = [[]]
+        for keyword in keywords:
+            self._add(keyword)
+        self._build_failure_links()
+
+    def _add(self, keyword):
+        state = 0
+        for char in keyword:
+            next_state = self._transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self._transitions)
+                self._transitions.append({})
+                self._failure.append(0)
+                self._outputs.append([])
+                self._transitions[state][char] = next_state
+            state = next_state
+        if keyword not in self._outputs[state]:
+            self._outputs[state].append(keyword)
+
+    def _build_failure_links(self):
+        queue = deque(self._transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._transitions[state].items():
+                queue.append(next_state)
+                fallback = self._failure[state]
+                while fallback and char not in self._transitions[fallback]:
+                    fallback = self._failure[fallback]
+                self._failure[next_state] = self._transitions[fallback].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._failure[next_state]]
+
+    def find_all(self, text):
+        """Yield (start, keyword) for every keyword occurrence in `text`."""
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._transitions[state]:
+                state = self._failure[state]
+            state = self._transitions[state].get(char, 0)
+            for keyword in self._outputs[state]:
+                yield position - len(keyword) + 1, keyword
+
+
+class CrimeKeywordIndex:
+    """
+    Precompiled mapping from detected labels (or free text) to crime types.
+
+    `crime_keywords` maps a keyword to a crime type and `context_rules` maps a
+    crime type to {'keywords': [...], 'confidence_threshold': float}. A keyword
+    applies to a label when it occurs anywhere in the label, so 'mask' applies
+    to 'ski mask'. Each label's crime types and context-rule keywords are worked
+    out once, which makes classifying a detection a dictionary lookup.
+
+    Labels may be given as a {label: score} dict of model confidences; a plain
+    list of labels counts every label with confidence 1.0.
+    """
+
+    def __init__(self, crime_keywords, context_rules):
+        self.crime_keywords = crime_keywords
+        self.context_rules = context_rules
+        self._matcher = KeywordMatcher(
+            list(crime_keywords) + [kw for rules in context_rules.values() for kw in rules['keywords']]
+        )
+        self._label_crimes = {}
+        self._label_context = {}
+
+    def compile_labels(self, labels):
+        """Precompute lookups for every label the model can emit (e.g. config.id2label.values())."""
+        for label in labels:
+            self._compile_label(label.lower())
+
+    def _compile_label(self, label):
+        found = {keyword for _, keyword in self._matcher.find_all(label)}
+        self._label_crimes[label] = [crime for keyword, crime in self.crime_keywords.items() if keyword in found]
+        self._label_context[label] = {
+            crime_type: frozenset(kw for kw in rules['keywords'] if kw in found)
+            for crime_type, rules in self.context_rules.items()
+        }
+
+    def _lookup(self, label):
+        if label not in self._label_crimes:
+            self._compile_label(label)
+        return self._label_crimes[label], self._label_context[label]
+
+    def crime_types(self, labels):
+        """Crime type for every keyword that applies to each label (one vote per match)."""
+        votes = []
+        for label in labels:
+            votes.extend(self._lookup(label)[0])
+        return votes
+
+    def context_crime_type(self, labels):
+        """
+        First context rule whose evidence is strong enough, or None.
+
+        Each rule keyword contributes the best score of the labels it applies
+        to; the rule fires when the average over all its keywords reaches its
+        confidence_threshold.
+        """
+        label_scores = labels if isinstance(labels, dict) else dict.fromkeys(labels, 1.0)
+
+        evidence = {crime_type: {} for crime_type in self.context_rules}
+        for label, score in label_scores.items():
+            for crime_type, keywords in self._lookup(label)[1].items():
+                rule_evidence = evidence[crime_type]
+                for keyword in keywords:
+                    if score > rule_evidence.get(keyword, 0.0):
+                        rule_evidence[keyword] = score
+
+        for crime_type, rules in self.context_rules.items():
+            if sum(evidence[crime_type].values()) >= len(rules['keywords']) * rules['confidence_threshold']:
+                return crime_type
+        return None
+
+    def classify(self, labels):
+        """Context rules take priority; otherwise the most common crime type wins."""
+        context_crime_type = self.context_crime_type(labels)
+        if context_crime_type:
+            return context_crime_type
+
+        votes = self.crime_types(labels)
+        return Counter(votes).most_common(1)[0][0] if votes else 'Unspecified Crime'
+
+    def score_text(self, text):
+        """
+        Match keywords as whole words in free text, such as a transcribed description.
+        """
+        text = (text or "").lower()
+        keywords = []
+        for start, keyword in self._matcher.find_all(text):
+            end = start + len(keyword)
+            if (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                continue
+            if keyword not in keywords:
+                keywords.append(keyword)
+
+        return {
+            'keywords': keywords,
+            'crime_type': self.classify(keywords)
+        }
@@ -0,0 +1,78 @@
+import torch
+from torchvision.ops import batched_nms
+
+
+class Detections:
+    """
+    Detections for one image, stored as parallel arrays.
+
+    `label_ids` (N,) int64, `scores` (N,) float32 and `boxes` (N, 4) float32
+    as (x0, y0, x1, y1) relative to the model input's width/height. Batches
+    are never padded (see CrimeDetector.detect_crime_images), so the input is
+    the whole upload resized and the boxes apply to the original image too.
+    """
+    __slots__ = ("label_ids", "scores", "boxes", "id2label")
+
+    def __init__(self, label_ids, scores, boxes, id2label):
+        self.label_ids = label_ids
+        self.scores = scores
+        self.boxes = boxes
+        self.id2label = id2label
+
+    def __len__(self):
+        return len(self.label_ids)
+
+    @property
+    def labels(self):
+        return [self.id2label[int(label_id)].lower() for label_id in self.label_ids]
+
+    def label_scores(self):
+        """Highest score per distinct label."""
+        best = {}
+        for label, score in zip(self.labels, self.scores.tolist()):
+            if score > best.get(label, 0.0):
+                best[label] = score
+        return best
+
+    def to_list(self):
+        return [
+            {"label": label, "score": round(score, 4), "box": [round(v, 4) for v in box]}
+            for label, score, box in zip(self.labels, self.scores.tolist(), self.boxes.tolist())
+        ]
+
+
+def post_process(logits, pred_boxes, id2label, threshold=0.7, nms_iou=None):
+    """
+    Turn a batch of YOLOS outputs into one Detections per image.
+
+    Softmax, best class, score threshold and box conversion run once over the
+    whole (batch, queries) tensor; only the final per-image split is a loop.
+    With `nms_iou`, overlapping boxes of the same label are suppressed.
+    Boxes are relative to the batch tensor's size, which is only the image's
+    own size because batches hold same-size, unpadded images.
+    """
+    probas = logits.softmax(-1)[..., :-1]
+    scores, label_ids = probas.max(-1)
+    keep = scores > threshold
+
+    # (cx, cy, w, h) -> (x0, y0, x1, y1), still relative to the image size
+    cx, cy, w, h = pred_boxes.unbind(-1)
+    boxes = torch.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dim=-1).clamp(0, 1)
+
+    results = []
+    for row in range(logits.shape[0]):
+        image_scores = scores[row][keep[row]]
+        image_labels = label_ids[row][keep[row]]
+        image_boxes = boxes[row][keep[row]]
+
+        if nms_iou and len(image_scores) > 1:
+            kept = batched_nms(image_boxes, image_scores, image_labels, nms_iou)
+            image_scores, image_labels, image_boxes = image_scores[kept], image_labels[kept], image_boxes[kept]
+
+        results.append(Detections(
+            image_labels.numpy(),
+            image_scores.numpy(),
+            image_boxes.numpy(),
+            id2label
+        ))
+    return results
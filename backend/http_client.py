@@ -0,0 +1,57 @@
+import aiohttp
+
+
+class HttpClient:
+    """
+    Application-scoped aiohttp session.
+
+    One connection pool is shared by every outbound call (AssemblyAI etc.) so
+    TLS connections are reused across requests. Created on startup, closed on
+    shutdown.
+    """
+
+    def __init__(self, pool_size=100, pool_size_per_host=20, connect_timeout=10, read_timeout=60):
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._session = None
+
+    async def start(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=None, connect=self.connect_timeout, sock_read=self.read_timeout
+                )
+            )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            raise RuntimeError("HTTP client is not started")
+        return self._session
+
+    def get_stats(self):
+        if self._session is None:
+            return {"started": False}
+        # aiohttp has no public pool statistics; these are its internal bookkeeping
+        connector = self._session.connector
+        return {
+            "started": True,
+            "pool_size": self.pool_size,
+            "pool_size_per_host": self.pool_size_per_host,
+            "idle_connections": sum(len(conns) for conns in getattr(connector, "_conns", {}).values()),
+            "acquired_connections": len(getattr(connector, "_acquired", ())),
+        }
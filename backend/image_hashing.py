@@ -0,0 +1,35 @@
+import hashlib
+import io
+from PIL import Image
+
+
+def content_hash(image_bytes):
+    """SHA-256 of the uploaded bytes; identical files share a key."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def perceptual_hash(image_bytes, hash_size=8):
+    """
+    64-bit difference hash (dHash) of the image.
+    Re-encoded or resized copies of the same photo usually share it.
+    Returns None if the image can't be decoded, or if it has no gradients
+    (all bits equal), since every flat or near-flat image hashes the same.
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        # Let the JPEG decoder scale down while decoding instead of producing full-resolution pixels
+        image.draft("L", (hash_size * 8, hash_size * 8))
+        image = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    except Exception:
+        return None
+
+    pixels = list(image.getdata())
+    bits = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    if bits == 0 or bits == (1 << hash_size * hash_size) - 1:
+        return None
+    return f"{bits:0{hash_size * hash_size // 4}x}"
@@ -0,0 +1,118 @@
+import io
+import threading
+import numpy as np
+import torch
+from PIL import Image
+from transformers.models.yolos.image_processing_yolos import get_size_with_aspect_ratio
+
+
+class ImageTooLargeError(ValueError):
+    """Raised when an upload exceeds the byte or pixel limits."""
+
+
+def check_image_limits(image_bytes, max_bytes, max_pixels):
+    """
+    Validate an upload without decoding its pixels (PIL only reads the header here).
+    Returns the lazily-opened PIL image.
+    """
+    if max_bytes and len(image_bytes) > max_bytes:
+        raise ImageTooLargeError(f"Image is larger than {max_bytes} bytes")
+
+    image = Image.open(io.BytesIO(image_bytes))
+    width, height = image.size
+    if max_pixels and width * height > max_pixels:
+        raise ImageTooLargeError(f"Image has {width * height} pixels; the limit is {max_pixels}")
+    return image
+
+
+class ImagePreprocessor:
+    """
+    Memory-lean replacement for running YolosImageProcessor on full-size uploads.
+
+    Images are decoded straight to the model's target size (JPEGs use draft
+    mode, which scales down inside the decoder), then rescaled and normalized
+    in place into a per-thread float32 buffer that is reused across requests.
+    Resizing and normalization follow the processor's own configuration.
+    """
+
+    def __init__(self, size, image_mean, image_std, rescale_factor=1 / 255,
+                 input_size=None, max_bytes=None, max_pixels=None):
+        self.size = size
+        self.input_size = input_size
+        self.rescale_factor = np.float32(rescale_factor)
+        self.mean = np.asarray(image_mean, dtype=np.float32).reshape(3, 1, 1)
+        self.std = np.asarray(image_std, dtype=np.float32).reshape(3, 1, 1)
+        self.max_bytes = max_bytes
+        self.max_pixels = max_pixels
+        self._local = threading.local()
+
+    @classmethod
+    def from_processor(cls, processor, input_size=None, max_bytes=None, max_pixels=None):
+        return cls(
+            processor.size,
+            processor.image_mean,
+            processor.image_std,
+            rescale_factor=processor.rescale_factor,
+            input_size=input_size,
+            max_bytes=max_bytes,
+            max_pixels=max_pixels
+        )
+
+    def target_size(self, width, height):
+        """(height, width) the model input should have for an image of this size."""
+        if self.input_size:
+            return tuple(self.input_size)
+        if "height" in self.size and "width" in self.size:
+            return self.size["height"], self.size["width"]
+
+        # The processor's own rule: aspect ratio kept, both sides floored to a multiple of 16
+        target_height, target_width = get_size_with_aspect_ratio(
+            (height, width), self.size["shortest_edge"], self.size.get("longest_edge")
+        )
+        return int(target_height), int(target_width)
+
+    def load(self, image_bytes):
+        """Decode an upload directly at the model's input size."""
+        image = check_image_limits(image_bytes, self.max_bytes, self.max_pixels)
+        target_height, target_width = self.target_size(*image.size)
+
+        # No-op for formats other than JPEG
+        image.draft("RGB", (target_width, target_height))
+        return self.fit(image.convert("RGB"))
+
+    def fit(self, image):
+        """Resize an already decoded image to the model's input size."""
+        target_height, target_width = self.target_size(*image.size)
+        if image.size != (target_width, target_height):
+            image = image.resize((target_width, target_height), Image.BILINEAR)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return image
+
+    def _buffer(self, length):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or buffer.size < length:
+            buffer = np.empty(length, dtype=np.float32)
+            self._local.buffer = buffer
+        return buffer[:length]
+
+    def to_batch(self, images):
+        """
+        Normalize images that share one input size into an (N, 3, H, W) tensor.
+
+        There is no padding: the model takes no pixel mask, so a padded image
+        would get different logits depending on its batch-mates.
+        The tensor shares this thread's buffer, so use it before the next call.
+        """
+        images = [self.fit(image) for image in images]
+        width, height = images[0].size
+        if any(image.size != (width, height) for image in images):
+            raise ValueError("Images in one batch must share the same input size")
+
+        batch = self._buffer(len(images) * 3 * height * width).reshape(len(images), 3, height, width)
+        for index, image in enumerate(images):
+            target = batch[index]
+            np.multiply(np.asarray(image).transpose(2, 0, 1), self.rescale_factor, out=target)
+            target -= self.mean
+            target /= self.std
+        return torch.from_numpy(batch)
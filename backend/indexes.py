@@ -0,0 +1,137 @@
+import threading
+import time
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+
+# Every index the app's queries rely on, per collection. Names are fixed so
+# ensure_indexes() is idempotent and reports can match them up.
+INDEX_SPECS = {
+    "users": [
+        {"name": "username_unique", "keys": [("username", ASCENDING)], "unique": True},
+        {"name": "email_unique", "keys": [("email", ASCENDING)], "unique": True},
+    ],
+    "tickets": [
+        {"name": "ticket_number_unique", "keys": [("ticket_number", ASCENDING)], "unique": True},
+        # Police dashboard: a station's tickets, optionally by status, newest first.
+        # _id is the tie-breaker of the (created_at, _id) pagination cursor.
+        {
+            "name": "station_status_created_id",
+            "keys": [
+                ("police_station", ASCENDING), ("status", ASCENDING),
+                ("created_at", DESCENDING), ("_id", DESCENDING),
+            ],
+        },
+        {
+            "name": "station_created_id",
+            "keys": [("police_station", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        },
+        # User dashboard: a user's tickets, newest first
+        {
+            "name": "user_created_id",
+            "keys": [("user_name", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        },
+    ],
+    "refresh_tokens": [
+        # Expired tokens are deleted by the server
+        {"name": "expires_at_ttl", "keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+        {"name": "family", "keys": [("family_id", ASCENDING)]},
+        {"name": "kind_subject", "keys": [("kind", ASCENDING), ("subject", ASCENDING)]},
+    ],
+    "police_stations": [
+        {"name": "username_unique", "keys": [("username", ASCENDING)], "unique": True},
+        {"name": "name", "keys": [("name", ASCENDING)]},
+    ],
+}
+
+
+# Indexes superseded by the ones above; dropped by ensure_indexes() if present
+RETIRED_INDEXES = {
+    "tickets": ["station_status_created", "user_created"],  # Now end in _id for pagination
+}
+
+
+def ensure_indexes(db, specs=INDEX_SPECS, retired=RETIRED_INDEXES):
+    """
+    Create any missing indexes. Safe to run on every startup: existing
+    indexes with the same definition are left alone.
+
+    A failure (e.g. duplicate values blocking a unique index) is reported
+    rather than raised so the app still starts.
+    """
+    result = {"ensured": [], "failed": {}}
+    for collection_name, indexes in specs.items():
+        collection = db[collection_name]
+        for spec in indexes:
+            options = {k: v for k, v in spec.items() if k != "keys"}
+            full_name = f"{collection_name}.{spec['name']}"
+            try:
+                collection.create_index(spec["keys"], **options)
+                result["ensured"].append(full_name)
+            except OperationFailure as e:
+                print(f"Could not create index {full_name}: {e}")
+                result["failed"][full_name] = str(e)
+
+    for collection_name, names in retired.items():
+        collection = db[collection_name]
+        for name in names:
+            try:
+                collection.drop_index(name)
+                print(f"Dropped retired index {collection_name}.{name}")
+            except OperationFailure:
+                pass  # Already gone
+    return result
+
+
+def index_report(db, specs=INDEX_SPECS):
+    """
+    Compare the declared indexes with what is on the server.
+
+    `missing` are declared but absent; `unused` exist but have not served a
+    query since the server started (per $indexStats), and are candidates for
+    removal if that stays true under real traffic.
+    """
+    report = {}
+    for collection_name, indexes in specs.items():
+        collection = db[collection_name]
+        try:
+            existing = collection.index_information()
+        except PyMongoError as e:
+            report[collection_name] = {"error": str(e)}
+            continue
+
+        declared = {spec["name"] for spec in indexes}
+        entry = {
+            "missing": sorted(declared - set(existing)),
+            "undeclared": sorted(set(existing) - declared - {"_id_"}),
+        }
+        try:
+            entry["unused"] = sorted(
+                stats["name"]
+                for stats in collection.aggregate([{"$indexStats": {}}])
+                if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0
+            )
+        except PyMongoError:
+            entry["unused"] = None  # $indexStats needs clusterMonitor-style privileges
+        report[collection_name] = entry
+    return report
+
+
+class IndexReportCache:
+    """
+    Keeps the last `index_report` for `ttl_seconds`, so frequent /metrics
+    scrapes don't each run listIndexes and $indexStats on every collection.
+    Concurrent callers wait for a single refresh rather than all running it.
+    """
+
+    def __init__(self, ttl_seconds=300):
+        self.ttl_seconds = ttl_seconds
+        self._report = None
+        self._generated_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db):
+        with self._lock:
+            if self._report is None or time.monotonic() - self._generated_at >= self.ttl_seconds:
+                self._report = index_report(db)
+                self._generated_at = time.monotonic()
+            return self._report
@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager
+import numpy as np
+import torch
+from PIL import Image
+
+# Model input size (height, width) used by exported backends when none is configured.
+# TorchScript traces and ONNX graphs are built for one fixed spatial size.
+DEFAULT_EXPORT_SIZE = (512, 768)
+
+BACKENDS = ("eager", "torchscript", "int8", "onnx")
+
+
+@contextmanager
+def _atomic_export(export_path):
+    """
+    Yield a private temp path and move it onto `export_path` once written, so
+    worker processes exporting at the same time never load a half-written file.
+    """
+    temp_path = f"{export_path}.{os.getpid()}.tmp"
+    try:
+        yield temp_path
+        os.replace(temp_path, export_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class _DetectionOutputs(torch.nn.Module):
+    """Wraps the HF model so tracing/export sees plain (logits, pred_boxes) tensors."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        outputs = self.model(pixel_values=pixel_values)
+        return outputs.logits, outputs.pred_boxes
+
+
+class EagerBackend:
+    """Plain PyTorch forward pass."""
+    name = "eager"
+
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, pixel_values):
+        with torch.no_grad():
+            outputs = self.model(pixel_values=pixel_values)
+        return outputs.logits, outputs.pred_boxes
+
+
+class QuantizedBackend(EagerBackend):
+    """Eager model with nn.Linear weights dynamically quantized to int8."""
+    name = "int8"
+
+    def __init__(self, model):
+        # In place: the detector keeps using the same (now quantized) model object
+        super().__init__(torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        ))
+
+
+class TorchScriptBackend:
+    """Traced and frozen TorchScript module, cached on disk after the first export."""
+    name = "torchscript"
+
+    def __init__(self, model, input_size, export_path):
+        if os.path.exists(export_path):
+            self.module = torch.jit.load(export_path)
+        else:
+            example = torch.zeros(1, 3, *input_size)
+            with torch.no_grad():
+                traced = torch.jit.trace(_DetectionOutputs(model).eval(), example, strict=False)
+                self.module = torch.jit.freeze(traced)
+            with _atomic_export(export_path) as temp_path:
+                torch.jit.save(self.module, temp_path)
+
+    def __call__(self, pixel_values):
+        with torch.no_grad():
+            return self.module(pixel_values)
+
+
+class OnnxRuntimeBackend:
+    """ONNX export run through ONNX Runtime's CPU provider (requires `pip install onnxruntime`)."""
+    name = "onnx"
+
+    def __init__(self, model, input_size, export_path, threads=0):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise RuntimeError("INFERENCE_BACKEND=onnx requires the onnxruntime package")
+
+        if not os.path.exists(export_path):
+            example = torch.zeros(1, 3, *input_size)
+            with torch.no_grad(), _atomic_export(export_path) as temp_path:
+                torch.onnx.export(
+                    _DetectionOutputs(model).eval(),
+                    example,
+                    temp_path,
+                    input_names=["pixel_values"],
+                    output_names=["logits", "pred_boxes"],
+                    dynamic_axes={
+                        "pixel_values": {0: "batch"},
+                        "logits": {0: "batch"},
+                        "pred_boxes": {0: "batch"}
+                    },
+                    opset_version=17
+                )
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            export_path, options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(self, pixel_values):
+        logits, pred_boxes = self.session.run(
+            None, {"pixel_values": pixel_values.numpy().astype(np.float32, copy=False)}
+        )
+        return torch.from_numpy(logits), torch.from_numpy(pred_boxes)
+
+
+def create_backend(name, model, input_size=None, export_dir="model_exports", model_name="yolos-small", threads=0):
+    """Build the inference backend `name` for `model`. Exported backends need a fixed input_size."""
+    if name == "eager":
+        return EagerBackend(model)
+    if name == "int8":
+        return QuantizedBackend(model)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}'. Must be one of {BACKENDS}")
+
+    input_size = input_size or DEFAULT_EXPORT_SIZE
+    os.makedirs(export_dir, exist_ok=True)
+    suffix = "pt" if name == "torchscript" else "onnx"
+    export_path = os.path.join(export_dir, f"{model_name}_{input_size[0]}x{input_size[1]}.{suffix}")
+
+    if name == "torchscript":
+        return TorchScriptBackend(model, input_size, export_path)
+    return OnnxRuntimeBackend(model, input_size, export_path, threads=threads)
+
+
+def _timed(backend, pixel_values, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        outputs = backend(pixel_values)
+        timings.append(time.perf_counter() - started)
+    return outputs, min(timings)
+
+
+def _synthetic_images(count, size):
+    # Random blocks of colour; no real objects, so only logits/agreement are meaningful
+    rng = np.random.default_rng(0)
+    images = []
+    for _ in range(count):
+        blocks = rng.integers(0, 255, size=(8, 8, 3), dtype=np.uint8)
+        images.append(Image.fromarray(blocks).resize((size[1], size[0]), Image.NEAREST))
+    return images
+
+
+def compare_backends(candidate, image_paths=(), input_size=None, runs=3, threshold=0.7):
+    """
+    Run the same preprocessed images through the eager model and `candidate`
+    and report latency and how far the candidate's outputs drift.
+
+    Exported backends also force a fixed, aspect-distorting input size, so
+    the final detections are additionally compared with eager at the
+    processor's own aspect-preserving resize (what the app runs by default).
+    """
+    from backend.crime_detection import CrimeDetector
+    from backend.image_preprocessing import ImagePreprocessor
+
+    input_size = input_size or DEFAULT_EXPORT_SIZE
+    reference = CrimeDetector(backend="eager", input_size=input_size)
+    other = CrimeDetector(backend=candidate, input_size=input_size)
+    # Same eager model, fed the original images resized the default way
+    native = ImagePreprocessor.from_processor(reference.feature_extractor)
+
+    images = [Image.open(path).convert("RGB") for path in image_paths] or _synthetic_images(4, input_size)
+
+    max_prob_diff = 0.0
+    max_box_diff = 0.0
+    kept_agree = 0
+    kept_total = 0
+    eager_seconds = []
+    candidate_seconds = []
+    native_seconds = []
+    crime_type_agree = 0
+    keywords_agree = 0
+
+    for image in images:
+        # End to end: native-size eager vs. the candidate at its fixed size
+        native_pixels = native.to_batch([image])
+        (native_logits, native_boxes), native_time = _timed(reference.backend, native_pixels, runs)
+        native_seconds.append(native_time)
+        native_result = reference._classify_detections(reference.post_process(native_logits, native_boxes)[0])
+        candidate_result = other.detect_crime_images([image])[0]
+        crime_type_agree += native_result["crime_type"] == candidate_result["crime_type"]
+        keywords_agree += set(native_result["keywords"]) == set(candidate_result["keywords"])
+
+        pixel_values = reference.preprocess([image])
+        (ref_logits, ref_boxes), ref_time = _timed(reference.backend, pixel_values, runs)
+        (out_logits, out_boxes), out_time = _timed(other.backend, pixel_values, runs)
+        eager_seconds.append(ref_time)
+        candidate_seconds.append(out_time)
+
+        ref_probas = ref_logits.softmax(-1)[0, :, :-1]
+        out_probas = out_logits.softmax(-1)[0, :, :-1]
+        max_prob_diff = max(max_prob_diff, (ref_probas - out_probas).abs().max().item())
+        max_box_diff = max(max_box_diff, (ref_boxes - out_boxes).abs().max().item())
+
+        # Of the detections eager keeps, how many does the candidate keep with the same label?
+        ref_scores, ref_labels = ref_probas.max(-1)
+        out_scores, out_labels = out_probas.max(-1)
+        kept = ref_scores > threshold
+        kept_total += int(kept.sum())
+        kept_agree += int(((out_labels == ref_labels) & (out_scores > threshold) & kept).sum())
+
+    eager_ms = 1000 * sum(eager_seconds) / len(eager_seconds)
+    candidate_ms = 1000 * sum(candidate_seconds) / len(candidate_seconds)
+    native_ms = 1000 * sum(native_seconds) / len(native_seconds)
+    return {
+        "candidate": candidate,
+        "input_size": list(input_size),
+        "images": len(images),
+        "eager_latency_ms": round(eager_ms, 2),
+        "candidate_latency_ms": round(candidate_ms, 2),
+        "speedup": round(eager_ms / candidate_ms, 3) if candidate_ms else None,
+        "max_probability_diff": round(max_prob_diff, 5),
+        "max_box_diff": round(max_box_diff, 5),
+        "kept_detections": kept_total,
+        "kept_detection_agreement": round(kept_agree / kept_total, 4) if kept_total else None,
+        # Against eager without a fixed input size: the cost of switching, resize included
+        "native_eager_latency_ms": round(native_ms, 2),
+        "native_crime_type_agreement": round(crime_type_agree / len(images), 4),
+        "native_keyword_agreement": round(keywords_agree / len(images), 4),
+    }
+
+
+if __name__ == "__main__":
+    # python -m backend.inference_backends onnx --images evidence1.jpg evidence2.jpg
+    parser = argparse.ArgumentParser(description="Compare an inference backend against eager PyTorch")
+    parser.add_argument("backend", choices=[b for b in BACKENDS if b != "eager"])
+    parser.add_argument("--images", nargs="*", default=[])
+    parser.add_argument("--height", type=int, default=DEFAULT_EXPORT_SIZE[0])
+    parser.add_argument("--width", type=int, default=DEFAULT_EXPORT_SIZE[1])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    report = compare_backends(args.backend, args.images, (args.height, args.width), runs=args.runs)
+    print(json.dumps(report, indent=2))
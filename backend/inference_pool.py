@@ -0,0 +1,226 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from backend.batching import BatchingScheduler
+from backend.crime_detection import detect_crime_batch, model_registry
+from backend.image_hashing import content_hash, perceptual_hash
+from backend.video_analysis import analyze_video_file
+
+# Extra time a video worker gets past its deadline to finish the frame batch in progress
+VIDEO_DEADLINE_GRACE_SECONDS = 10.0
+
+
+def _init_worker(torch_threads, warm_up):
+    """Runs once in every worker process: load the detector before any request arrives."""
+    import torch
+    if torch_threads:
+        torch.set_num_threads(torch_threads)
+    if warm_up:
+        model_registry.warm_up()
+
+
+def _worker_model_stats():
+    return model_registry.get_stats()
+
+
+class InferencePool:
+    """
+    Runs crime detection off the event loop.
+
+    With `workers > 0` each request is micro-batched and sent to a dedicated
+    process pool whose workers hold a preloaded detector. With `workers == 0`
+    the shared in-process detector runs in the default thread pool instead.
+
+    At most `queue_size` requests per worker may be waiting or running; further
+    requests and requests that exceed `timeout_seconds` degrade to an
+    'Unspecified Crime' result instead of piling up behind the model.
+
+    When a ResultCache is given, results are stored under the SHA-256 of the
+    upload and, with `perceptual_cache`, under its dHash as well, so repeat
+    uploads and re-encoded copies skip inference.
+    """
+
+    def __init__(self, workers=1, queue_size=16, timeout_seconds=30.0,
+                 max_batch_size=8, max_wait_ms=10, torch_threads=0, warm_up=True,
+                 cache=None, perceptual_cache=True, video_timeout_seconds=120.0):
+        self.workers = max(0, workers)
+        self.capacity = max(1, queue_size) * max(1, self.workers)
+        self.timeout_seconds = timeout_seconds
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.torch_threads = torch_threads
+        self.warm_up = warm_up
+        self.cache = cache
+        self.perceptual_cache = perceptual_cache
+        self.video_timeout_seconds = video_timeout_seconds
+        self.scheduler = None
+        self._executor = None
+        self._in_flight = 0
+        self._worker_model_stats = []
+
+        # Metrics
+        self.accepted = 0
+        self.completed = 0
+        self.rejected_saturated = 0
+        self.timed_out = 0
+        self.failed = 0
+        self.videos_completed = 0
+
+    async def start(self):
+        """Start the worker processes (or warm the in-process model) and the batcher."""
+        loop = asyncio.get_running_loop()
+
+        if self.workers:
+            # 'spawn' keeps torch's thread pools out of forked children
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.torch_threads, self.warm_up)
+            )
+            self._worker_model_stats = await asyncio.gather(*[
+                loop.run_in_executor(self._executor, _worker_model_stats)
+                for _ in range(self.workers)
+            ])
+        elif self.warm_up:
+            await loop.run_in_executor(None, model_registry.warm_up)
+
+        self.scheduler = BatchingScheduler(
+            detect_crime_batch,
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait_ms,
+            executor=self._executor,
+            max_concurrent_batches=max(1, self.workers)
+        )
+        await self.scheduler.start()
+
+    async def stop(self):
+        """Stop the batcher and shut the worker processes down."""
+        if self.scheduler is not None:
+            await self.scheduler.stop()
+            self.scheduler = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self.cache is not None:
+            self.cache.close()
+
+    async def analyze(self, image_bytes):
+        """
+        Detect crime in one image without blocking the event loop.
+        Always returns a result; `degraded` is True when the model was skipped.
+        """
+        cache_keys = []
+        if self.cache is not None:
+            cached, cache_keys = await self._cache_lookup(image_bytes)
+            if cached is not None:
+                return {**cached, "degraded": False, "cached": True}
+
+        if self.scheduler is None or self._in_flight >= self.capacity:
+            self.rejected_saturated += 1
+            return self._degraded_result("saturated")
+
+        self._in_flight += 1
+        self.accepted += 1
+        try:
+            result = await asyncio.wait_for(self.scheduler.submit(image_bytes), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return self._degraded_result("timeout")
+        except Exception as e:
+            print(f"Error in crime detection worker: {e}")
+            self.failed += 1
+            return self._degraded_result("error")
+        finally:
+            self._in_flight -= 1
+
+        if result.get("degraded"):
+            # The detector failed on this image; a retry may well succeed, so don't cache it
+            self.failed += 1
+            return {**result, "cached": False}
+
+        self.completed += 1
+        for key in cache_keys:
+            self.cache.set(key, result)
+        return {**result, "degraded": False, "cached": False}
+
+    async def analyze_video(self, path):
+        """
+        Analyze a video file on one worker (sampled frames, batched, early exit).
+        The clip takes one of the scheduler's batch slots, so it doesn't
+        overcommit a worker that is also serving image batches. The worker
+        stops decoding at the deadline and the partial result is returned as
+        degraded; like `analyze`, it also degrades when the pool is saturated.
+        """
+        if self.scheduler is None or self._in_flight >= self.capacity:
+            self.rejected_saturated += 1
+            return self._degraded_result("saturated")
+
+        self._in_flight += 1
+        self.accepted += 1
+        deadline = time.time() + self.video_timeout_seconds
+        try:
+            # The worker enforces the deadline itself; this only guards against a stuck one
+            result = await asyncio.wait_for(
+                self.scheduler.run(analyze_video_file, path, deadline),
+                self.video_timeout_seconds + VIDEO_DEADLINE_GRACE_SECONDS
+            )
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return self._degraded_result("timeout")
+        except Exception as e:
+            print(f"Error in video analysis worker: {e}")
+            self.failed += 1
+            return self._degraded_result("error")
+        finally:
+            self._in_flight -= 1
+
+        if result["timed_out"]:
+            self.timed_out += 1
+            return {**result, "degraded": True, "reason": "timeout"}
+        self.videos_completed += 1
+        return {**result, "degraded": False}
+
+    async def _cache_lookup(self, image_bytes):
+        keys = ["sha256:" + content_hash(image_bytes)]
+        result = await self.cache.aget(keys[0])
+        if result is not None or not self.perceptual_cache:
+            return result, keys
+
+        # The perceptual hash needs a (draft) decode, so keep it off the event loop
+        loop = asyncio.get_running_loop()
+        phash = await loop.run_in_executor(None, perceptual_hash, image_bytes)
+        if phash:
+            keys.append("dhash:" + phash)
+            result = await self.cache.aget(keys[1])
+            if result is not None:
+                self.cache.set(keys[0], result)
+        return result, keys
+
+    def _degraded_result(self, reason):
+        return {
+            "keywords": [],
+            "crime_type": "Unspecified Crime",
+            "detections": [],
+            "degraded": True,
+            "cached": False,
+            "reason": reason
+        }
+
+    def get_stats(self):
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self._in_flight,
+            "timeout_seconds": self.timeout_seconds,
+            "accepted": self.accepted,
+            "completed": self.completed,
+            "rejected_saturated": self.rejected_saturated,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+            "videos_completed": self.videos_completed,
+            "batching": self.scheduler.get_stats() if self.scheduler is not None else None,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+            "worker_models": self._worker_model_stats,
+        }
@@ -0,0 +1,319 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class TTLStore(ABC):
+    """
+    Small key-value store where every entry expires after its own TTL.
+
+    Values must be JSON-serializable. Expired entries are invisible to reads
+    straight away and are physically removed by `sweep()`, which `start()`
+    runs every `sweep_interval` seconds in the background.
+
+    Code on the event loop should use the async methods (`aget`, `aset`,
+    ...), which keep a backend's blocking I/O off the loop.
+    """
+
+    backend = None
+
+    def __init__(self, sweep_interval=60):
+        self.sweep_interval = sweep_interval
+        self._sweeper = None
+
+        # Metrics
+        self.swept = 0
+        self.sweeps = 0
+
+    @abstractmethod
+    def get(self, key):
+        """Return the value stored under `key`, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key, value, ttl_seconds):
+        """Store `value` under `key` for `ttl_seconds`, replacing any current value."""
+
+    @abstractmethod
+    def add(self, key, value, ttl_seconds):
+        """Store `value` only if `key` is missing or expired. Returns True if it was stored."""
+
+    @abstractmethod
+    def incr(self, key, ttl_seconds):
+        """
+        Add one to the counter under `key` and return the new count. A new
+        counter expires after `ttl_seconds`; incrementing doesn't extend it.
+        """
+
+    @abstractmethod
+    def ttl(self, key):
+        """Seconds until `key` expires, or None if it is missing."""
+
+    @abstractmethod
+    def delete(self, *keys):
+        """Remove `keys`; missing ones are ignored."""
+
+    @abstractmethod
+    def sweep(self):
+        """Remove expired entries; returns how many were removed."""
+
+    @abstractmethod
+    def count(self):
+        """Number of stored entries, including expired ones not swept yet."""
+
+    async def _call(self, fn, *args):
+        """Run a blocking method; backends that do real I/O move it off the event loop."""
+        return fn(*args)
+
+    async def aget(self, key):
+        return await self._call(self.get, key)
+
+    async def aset(self, key, value, ttl_seconds):
+        return await self._call(self.set, key, value, ttl_seconds)
+
+    async def aadd(self, key, value, ttl_seconds):
+        return await self._call(self.add, key, value, ttl_seconds)
+
+    async def aincr(self, key, ttl_seconds):
+        return await self._call(self.incr, key, ttl_seconds)
+
+    async def attl(self, key):
+        return await self._call(self.ttl, key)
+
+    async def adelete(self, *keys):
+        return await self._call(self.delete, *keys)
+
+    async def start(self):
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                removed = await self._call(self.sweep)
+            except Exception as e:
+                print(f"TTL store sweep failed: {e}")
+                continue
+            self.sweeps += 1
+            self.swept += removed
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        self.close()
+
+    def close(self):
+        pass
+
+    def get_stats(self):
+        return {
+            "backend": self.backend,
+            "entries": self.count(),
+            "sweep_interval": self.sweep_interval,
+            "sweeps": self.sweeps,
+            "swept": self.swept,
+        }
+
+
+class MemoryTTLStore(TTLStore):
+    """TTLStore kept in this process; each uvicorn worker has its own."""
+
+    backend = "memory"
+
+    def __init__(self, sweep_interval=60):
+        super().__init__(sweep_interval)
+        self._entries = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key, time.time())
+            return None if entry is None else entry[1]
+
+    def set(self, key, value, ttl_seconds):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl_seconds, value)
+
+    def add(self, key, value, ttl_seconds):
+        now = time.time()
+        with self._lock:
+            if self._live(key, now) is not None:
+                return False
+            self._entries[key] = (now + ttl_seconds, value)
+            return True
+
+    def incr(self, key, ttl_seconds):
+        now = time.time()
+        with self._lock:
+            entry = self._live(key, now)
+            if entry is None:
+                entry = (now + ttl_seconds, 0)
+            count = entry[1] + 1
+            self._entries[key] = (entry[0], count)
+            return count
+
+    def ttl(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._live(key, now)
+            return None if entry is None else entry[0] - now
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+    def count(self):
+        return len(self._entries)
+
+
+class SQLiteTTLStore(TTLStore):
+    """
+    TTLStore in a SQLite file, shared by every worker process on the host.
+
+    The database runs in WAL mode so readers don't block the writer, and
+    read-modify-write operations (`add`, `incr`) run in an IMMEDIATE
+    transaction so two workers can't both win the same key. Waiting for
+    another worker's lock can take up to `busy_timeout_seconds`, so the
+    async methods run on the store's own thread.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path, sweep_interval=60, busy_timeout_seconds=5.0):
+        super().__init__(sweep_interval)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly where needed
+        self._conn = sqlite3.connect(
+            path, timeout=busy_timeout_seconds, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ttl-store")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv_store ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS kv_store_expires_at ON kv_store (expires_at)")
+
+    async def _call(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _read(self, key, now):
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM kv_store WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+    def get(self, key):
+        with self._lock:
+            row = self._read(key, time.time())
+        return None if row is None else row[0]
+
+    def set(self, key, value, ttl_seconds):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv_store (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl_seconds)
+            )
+
+    def add(self, key, value, ttl_seconds):
+        now = time.time()
+        with self._lock, self._transaction():
+            if self._read(key, now) is not None:
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv_store (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + ttl_seconds)
+            )
+            return True
+
+    def incr(self, key, ttl_seconds):
+        now = time.time()
+        with self._lock, self._transaction():
+            row = self._read(key, now)
+            count, expires_at = (0, now + ttl_seconds) if row is None else row
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv_store (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(count + 1), expires_at)
+            )
+            return count + 1
+
+    def ttl(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._read(key, now)
+        return None if row is None else row[1] - now
+
+    def delete(self, *keys):
+        with self._lock:
+            self._conn.executemany("DELETE FROM kv_store WHERE key = ?", [(key,) for key in keys])
+
+    def sweep(self):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM kv_store WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM kv_store").fetchone()[0]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self):
+        return {**super().get_stats(), "path": self.path}
+
+
+def create_ttl_store(backend, path=None, sweep_interval=60):
+    """Build the TTLStore named by `backend` ("memory" or "sqlite")."""
+    if backend == "memory":
+        return MemoryTTLStore(sweep_interval=sweep_interval)
+    if backend == "sqlite":
+        return SQLiteTTLStore(path, sweep_interval=sweep_interval)
+    raise ValueError(f"Unknown TTL store backend: {backend}")
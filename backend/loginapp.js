@@ -25,6 +25,7 @@ document.addEventListener('DOMContentLoaded', () => {
     
                 if (response.ok) {
                     localStorage.setItem('access_token', data.access_token);
+                    localStorage.setItem('refresh_token', data.refresh_token);
                     localStorage.setItem('user_id', data.user_id);
                     window.location.href = 'user_dashboard.html';
                 } else {
@@ -59,6 +60,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
                 if (response.ok) {
                     localStorage.setItem('access_token', data.access_token);
+                    localStorage.setItem('refresh_token', data.refresh_token);
                     localStorage.setItem('police_station_id', data.police_station_id);
                     window.location.href = 'police_dashboard.html';
                 } else {
@@ -78,6 +80,7 @@ document.addEventListener('DOMContentLoaded', () => {
     if (logoutButton) {
         logoutButton.addEventListener('click', () => {
             localStorage.removeItem('access_token');
+            localStorage.removeItem('refresh_token');
             localStorage.removeItem('user_id');
             localStorage.removeItem('police_station_id');
             window.location.href = 'login.html';
@@ -0,0 +1,87 @@
+import io
+import os
+import threading
+import time
+from PIL import Image
+
+
+def current_rss_bytes():
+    """Return the resident set size of this process in bytes (None if unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Holds one warm CrimeDetector per process.
+
+    The detector is built lazily by `factory` the first time it is requested and
+    the same instance is handed to every caller afterwards. The detector keeps no
+    per-call state (inference runs under torch.no_grad()), so it is safe to share
+    across threads; the lock only guards the one-time load.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._detector = None
+        self._stats = {
+            "loaded": False,
+            "load_time_seconds": None,
+            "warmup_time_seconds": None,
+            "parameter_bytes": None,
+            "rss_before_load_bytes": None,
+            "rss_after_load_bytes": None,
+            "pid": os.getpid(),
+        }
+
+    def get_detector(self):
+        """Return the shared detector, loading it on first use."""
+        detector = self._detector
+        if detector is None:
+            with self._lock:
+                if self._detector is None:
+                    self._detector = self._load()
+                detector = self._detector
+        return detector
+
+    def _load(self):
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+
+        detector = self._factory()
+
+        self._stats.update({
+            "loaded": True,
+            "load_time_seconds": round(time.perf_counter() - started, 3),
+            "parameter_bytes": sum(
+                p.numel() * p.element_size() for p in detector.model.parameters()
+            ),
+            "rss_before_load_bytes": rss_before,
+            "rss_after_load_bytes": current_rss_bytes(),
+            "pid": os.getpid(),
+        })
+        return detector
+
+    def warm_up(self):
+        """Load the detector and run one dummy inference so the first request is not slow."""
+        detector = self.get_detector()
+
+        # Small blank JPEG; enough to initialise the processor and the forward pass
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 64)).save(buffer, format="JPEG")
+
+        started = time.perf_counter()
+        detector.detect_crime(buffer.getvalue())
+        self._stats["warmup_time_seconds"] = round(time.perf_counter() - started, 3)
+        return detector
+
+    def get_stats(self):
+        """Load time and memory footprint of the detector in this process."""
+        stats = dict(self._stats)
+        stats["rss_current_bytes"] = current_rss_bytes()
+        return stats
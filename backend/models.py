@@ -2,7 +2,6 @@ from pydantic import BaseModel, Field, EmailStr, validator, constr
 from typing import Optional, List
 from bson import ObjectId
 from datetime import datetime
-import random
 import re
 import pytz
 
@@ -56,7 +55,7 @@ def get_ist_time():
 
 class Ticket(BaseModel):
     id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
-    ticket_number: str = Field(default_factory=lambda: f"{random.randint(100000, 999999)}")
+    ticket_number: Optional[str] = None  # Allocated by the server
     user_id: str
     user_name: Optional[str] = None
     pincode: str
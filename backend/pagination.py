@@ -0,0 +1,90 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from pymongo import DESCENDING
+
+# Fields the dashboards' ticket lists show; the full document comes from /ticket-details
+POLICE_TICKET_LIST_PROJECTION = {
+    "ticket_number": 1, "crime_type": 1, "pincode": 1, "status": 1, "created_at": 1,
+}
+USER_TICKET_LIST_PROJECTION = {
+    "ticket_number": 1, "crime_type": 1, "pincode": 1, "status": 1, "created_at": 1,
+    "phone_number": 1, "police_station": 1, "description": 1,
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(document):
+    """Opaque cursor pointing just after `document` in (created_at, _id) descending order."""
+    created_at = document.get("created_at")
+    payload = {
+        "t": created_at.isoformat() if isinstance(created_at, datetime) else None,
+        "id": str(document["_id"]),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Raises ValueError for anything that isn't a cursor we issued."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = datetime.fromisoformat(payload["t"]) if payload["t"] else None
+        return created_at, ObjectId(payload["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def after_cursor(cursor):
+    """
+    Filter for documents after the cursor. Documents without created_at sort
+    last (null is the lowest value), so they follow every dated page.
+    """
+    created_at, last_id = decode_cursor(cursor)
+    if created_at is None:
+        return {"created_at": None, "_id": {"$lt": last_id}}
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": last_id}},
+        {"created_at": None},
+    ]}
+
+
+async def fetch_page(collection, query, projection, limit=DEFAULT_PAGE_SIZE, cursor=None):
+    """
+    One page of `collection` matching `query`, newest first.
+
+    Keyset pagination on (created_at, _id): each page is an index range scan
+    from the cursor rather than a skip over everything before it. Returns
+    {"items": [...], "next_cursor": str or None}.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        query = {"$and": [query, after_cursor(cursor)]}
+
+    documents = await (
+        collection.find(query, projection)
+        .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit + 1)
+        .to_list(None)
+    )
+    next_cursor = encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+    return {"items": documents[:limit], "next_cursor": next_cursor}
+
+
+def ticket_filters(status=None, crime_type=None, created_from=None, created_to=None):
+    """Optional list filters, applied in the query rather than after fetching."""
+    query = {}
+    if status:
+        query["status"] = status
+    if crime_type:
+        query["crime_type"] = crime_type
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    return query
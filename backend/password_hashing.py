@@ -0,0 +1,83 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hash/verify calls are already waiting; the caller should retry later."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so `workers` threads hash in parallel while the
+    loop keeps serving other requests. At most `max_pending` calls may be
+    queued or running; beyond that PasswordHasherBusy is raised instead of
+    letting a login storm queue without bound. Only auth requests wait on
+    this pool, so heavy auth load slows auth down and leaves everything else
+    alone.
+    """
+
+    def __init__(self, pwd_context, workers=2, max_pending=64):
+        self.pwd_context = pwd_context
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+
+        # Metrics
+        self.completed = 0
+        self.rejected = 0
+        self.max_pending_seen = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    async def hash(self, password):
+        return await self._run(self.pwd_context.hash, password)
+
+    async def verify(self, plain_password, hashed_password):
+        return await self._run(self.pwd_context.verify, plain_password, hashed_password)
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy("Authentication is busy, please retry shortly")
+
+        self._pending += 1
+        self.max_pending_seen = max(self.max_pending_seen, self._pending)
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started - submitted, time.perf_counter() - started
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, queued, ran = await loop.run_in_executor(self._executor, timed)
+        finally:
+            self._pending -= 1
+
+        self.completed += 1
+        self.queue_seconds_total += queued
+        self.queue_seconds_max = max(self.queue_seconds_max, queued)
+        self.run_seconds_total += ran
+        return result
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self):
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "max_pending_seen": self.max_pending_seen,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_queue_ms": round(1000 * self.queue_seconds_total / self.completed, 3) if self.completed else None,
+            "max_queue_ms": round(1000 * self.queue_seconds_max, 3),
+            "avg_hash_ms": round(1000 * self.run_seconds_total / self.completed, 3) if self.completed else None,
+        }
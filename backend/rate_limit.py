@@ -0,0 +1,180 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from starlette.responses import JSONResponse
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by arbitrary strings, held in a bounded LRU.
+
+    A bucket holds up to `burst` tokens and refills at `rate` tokens per
+    second; each request takes one. Buckets are only refilled when touched,
+    so a check is O(1) and idle clients cost nothing. Once `max_buckets` is
+    reached the least recently used bucket is dropped, which at worst gives
+    that client a fresh, full bucket.
+    """
+
+    def __init__(self, max_buckets=100000):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.evictions = 0
+
+    def acquire(self, key, rate, burst):
+        """Take a token from `key`'s bucket. Returns 0 if allowed, else seconds until one is available."""
+        return self.acquire_all([(key, rate, burst)])[0]
+
+    def acquire_all(self, buckets):
+        """
+        Take one token from each of `buckets`, a list of (key, rate, burst),
+        but only if every one of them has a token. Returns the seconds to
+        wait per bucket: all zeros when the tokens were taken.
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            for key, rate, burst in buckets:
+                entry = self._buckets.get(key)
+                if entry is None:
+                    tokens = burst
+                else:
+                    tokens = min(burst, entry[0] + (now - entry[1]) * rate)
+                    self._buckets.move_to_end(key)
+                levels.append(tokens)
+
+            waits = [0 if tokens >= 1 else (1 - tokens) / rate
+                     for tokens, (_, rate, _) in zip(levels, buckets)]
+            # All or nothing, so a throttled request doesn't drain its other buckets
+            cost = 0 if any(waits) else 1
+            for tokens, (key, _, _) in zip(levels, buckets):
+                self._buckets[key] = (tokens - cost, now)
+
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+
+        return waits
+
+    def get_stats(self):
+        return {
+            "buckets": len(self._buckets),
+            "max_buckets": self.max_buckets,
+            "evictions": self.evictions,
+        }
+
+
+class RateLimitPolicy:
+    """
+    Allows `per_minute` requests per `scope` on the matching routes, with
+    bursts of up to `burst`.
+
+    `scope` is "ip" (per client address), "user" (per authenticated token
+    subject, falling back to the address for anonymous requests) or "route"
+    (one bucket shared by every caller). `paths` are matched exactly; None
+    matches every path.
+    """
+
+    def __init__(self, name, scope, per_minute, burst=None, paths=None, methods=("POST",)):
+        if scope not in ("ip", "user", "route"):
+            raise ValueError(f"Unknown rate limit scope: {scope}")
+        self.name = name
+        self.scope = scope
+        self.rate = per_minute / 60.0
+        self.burst = burst or per_minute
+        self.paths = frozenset(paths) if paths is not None else None
+        self.methods = frozenset(methods) if methods is not None else None
+
+        # Metrics
+        self.checked = 0
+        self.throttled = 0
+
+    def matches(self, method, path):
+        return ((self.methods is None or method in self.methods)
+                and (self.paths is None or path in self.paths))
+
+    def get_stats(self):
+        return {
+            "scope": self.scope,
+            "per_minute": round(self.rate * 60, 3),
+            "burst": self.burst,
+            "checked": self.checked,
+            "throttled": self.throttled,
+        }
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware that checks every request against `policies` before it
+    reaches the app, answering 429 with a Retry-After header when any
+    matching policy's bucket is empty. Tokens are only taken when all of
+    the matching buckets have one.
+
+    `identify_user(authorization_header)` returns the subject of a valid
+    bearer token or None. Buckets live in this process, so with several
+    workers each one enforces the limits separately. Counters are kept on
+    the limiter and the policies, since Starlette builds the middleware
+    instance itself.
+    """
+
+    def __init__(self, app, limiter, policies, identify_user=None, trust_forwarded_for=False):
+        self.app = app
+        self.limiter = limiter
+        self.policies = policies
+        self.identify_user = identify_user
+        self.trust_forwarded_for = trust_forwarded_for
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        matching = [policy for policy in self.policies if policy.matches(method, path)]
+        if matching:
+            headers = {}
+            for name, value in scope.get("headers", ()):
+                headers[name.decode("latin-1")] = value.decode("latin-1")
+            client_ip = self._client_ip(scope, headers)
+            user = None
+
+            buckets = []
+            for policy in matching:
+                if policy.scope == "route":
+                    key = f"{policy.name}:{path}"
+                elif policy.scope == "user":
+                    if user is None:
+                        subject = self.identify_user(headers.get("authorization")) if self.identify_user else None
+                        user = f"user:{subject}" if subject else f"ip:{client_ip}"
+                    key = f"{policy.name}:{user}"
+                else:
+                    key = f"{policy.name}:ip:{client_ip}"
+
+                buckets.append((key, policy.rate, policy.burst))
+
+            waits = self.limiter.acquire_all(buckets)
+            for policy, wait in zip(matching, waits):
+                policy.checked += 1
+                if wait:
+                    policy.throttled += 1
+            if any(waits):
+                response = JSONResponse(
+                    status_code=429,
+                    content={"success": False, "detail": "Too many requests, please retry later"},
+                    headers={"Retry-After": str(max(1, math.ceil(max(waits))))}
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+    def _client_ip(self, scope, headers):
+        if self.trust_forwarded_for:
+            forwarded = headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
@@ -0,0 +1,108 @@
+import hashlib
+import hmac
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
+
+
+class RefreshTokenError(Exception):
+    """The refresh token is unknown, expired, revoked or was already used."""
+
+
+class RefreshTokenStore:
+    """
+    Long-lived, single-use refresh tokens for renewing access tokens without
+    a password (and so without bcrypt).
+
+    Tokens are random strings; only HMAC-SHA256(secret, token) is stored, so
+    checking one costs a hash and an indexed lookup, and a database leak
+    doesn't reveal usable tokens. Every refresh rotates the token. All
+    tokens descending from one login share a `family_id`: presenting a token
+    that was already rotated means it leaked, so the whole family is revoked.
+    Expired documents are removed by a TTL index on `expires_at`.
+    """
+
+    def __init__(self, collection, secret_key, ttl_days=14):
+        self.collection = collection  # Motor collection
+        self._secret = secret_key.encode()
+        self.ttl = timedelta(days=ttl_days)
+
+        # Metrics
+        self.issued = 0
+        self.rotated = 0
+        self.rejected = 0
+        self.reuse_detected = 0
+
+    def _digest(self, token):
+        return hmac.new(self._secret, token.encode(), hashlib.sha256).hexdigest()
+
+    async def issue(self, kind, subject, family_id=None):
+        """Store a new refresh token for `subject` and return it."""
+        token = secrets.token_urlsafe(32)
+        now = datetime.now(timezone.utc)
+        await self.collection.insert_one({
+            "_id": self._digest(token),
+            "kind": kind,
+            "subject": subject,
+            "family_id": family_id or uuid.uuid4().hex,
+            "created_at": now,
+            "expires_at": now + self.ttl,
+            "revoked": False,
+        })
+        self.issued += 1
+        return token
+
+    async def rotate(self, token):
+        """
+        Spend `token` and return (kind, subject, new_token).
+        Raises RefreshTokenError if it can't be used.
+        """
+        now = datetime.now(timezone.utc)
+        digest = self._digest(token)
+        # Atomically mark it used, so two concurrent refreshes can't both succeed
+        document = await self.collection.find_one_and_update(
+            {"_id": digest, "revoked": False, "expires_at": {"$gt": now}},
+            {"$set": {"revoked": True, "revoked_at": now}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if document is None:
+            self.rejected += 1
+            spent = await self.collection.find_one({"_id": digest, "revoked": True}, {"family_id": 1})
+            if spent is not None:
+                self.reuse_detected += 1
+                await self.collection.update_many(
+                    {"family_id": spent["family_id"], "revoked": False},
+                    {"$set": {"revoked": True, "revoked_at": now}}
+                )
+            raise RefreshTokenError("Invalid or expired refresh token")
+
+        new_token = await self.issue(document["kind"], document["subject"], document["family_id"])
+        self.rotated += 1
+        return document["kind"], document["subject"], new_token
+
+    async def revoke(self, token):
+        """Revoke the token's whole family (logout). Returns False if it was unknown."""
+        document = await self.collection.find_one({"_id": self._digest(token)}, {"family_id": 1})
+        if document is None:
+            return False
+        await self.collection.update_many(
+            {"family_id": document["family_id"], "revoked": False},
+            {"$set": {"revoked": True, "revoked_at": datetime.now(timezone.utc)}}
+        )
+        return True
+
+    async def revoke_subject(self, kind, subject):
+        """Revoke every session of an account, e.g. after a password reset."""
+        await self.collection.update_many(
+            {"kind": kind, "subject": subject, "revoked": False},
+            {"$set": {"revoked": True, "revoked_at": datetime.now(timezone.utc)}}
+        )
+
+    def get_stats(self):
+        return {
+            "issued": self.issued,
+            "rotated": self.rotated,
+            "rejected": self.rejected,
+            "reuse_detected": self.reuse_detected,
+        }
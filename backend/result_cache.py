@@ -0,0 +1,233 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ResultCache:
+    """
+    Two-tier cache for JSON-serializable results.
+
+    The memory tier is an LRU bounded by both entry count and total serialized
+    size in bytes; every entry also expires after `ttl_seconds`. When
+    `disk_path` is set, entries are written through to a SQLite file so they
+    survive restarts, and memory misses fall back to it.
+
+    The disk tier is shared by every worker process, so it runs in WAL mode
+    with a busy timeout, and all of its I/O happens on one background thread:
+    `aget` awaits disk reads there and `set` only queues the write. Every
+    `prune_interval_seconds` the writer drops expired rows and, past
+    `disk_max_bytes`, the entries closest to expiry.
+    """
+
+    def __init__(self, namespace, max_entries=1024, max_bytes=16 * 1024 * 1024,
+                 ttl_seconds=24 * 3600, disk_path=None, disk_max_bytes=256 * 1024 * 1024,
+                 prune_interval_seconds=600, busy_timeout_seconds=5.0):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_bytes = disk_max_bytes
+        self.prune_interval_seconds = prune_interval_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_lock = threading.Lock()
+        self._disk_executor = None
+        self._last_prune = 0.0
+
+        # Metrics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_pruned = 0
+
+        if disk_path:
+            self._open_disk(disk_path, busy_timeout_seconds)
+
+    def _open_disk(self, disk_path, busy_timeout_seconds):
+        directory = os.path.dirname(disk_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            self._disk = sqlite3.connect(disk_path, timeout=busy_timeout_seconds, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute("PRAGMA synchronous=NORMAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._disk.execute(
+                "CREATE INDEX IF NOT EXISTS result_cache_expires_at ON result_cache (namespace, expires_at)"
+            )
+            self._disk.commit()
+            self._prune()
+        except sqlite3.Error as e:
+            print(f"Result cache disk tier disabled: {e}")
+            self._disk = None
+            return
+        self._disk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"cache-{self.namespace}")
+
+    def get(self, key):
+        """Return the cached value or None. Blocks on the disk tier; use `aget` on the event loop."""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            return value
+        return self._disk_fallback(key, now)
+
+    async def aget(self, key):
+        """Like `get`, but disk reads run on the cache's I/O thread."""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None or self._disk_executor is None:
+            if value is None:
+                self.misses += 1
+            return value
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._disk_executor, self._disk_fallback, key, now)
+
+    def set(self, key, value):
+        """Cache a value under `key` in memory and, if enabled, queue it for the disk tier."""
+        now = time.time()
+        with self._lock:
+            self._store(key, value, now)
+        if self._disk_executor is not None:
+            self._disk_executor.submit(self._disk_set, key, value, now)
+
+    def _memory_get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            self._remove(key)
+            return None
+
+    def _disk_fallback(self, key, now):
+        value = self._disk_get(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, value, now)
+        return value
+
+    def _store(self, key, value, now):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (now + self.ttl_seconds, size, value)
+        self._bytes += size
+
+        # Evict least recently used entries until both bounds hold
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _disk_get(self, key, now):
+        if self._disk is None:
+            return None
+        try:
+            with self._disk_lock:
+                row = self._disk.execute(
+                    "SELECT value, expires_at FROM result_cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Result cache disk read failed: {e}")
+            return None
+        if row is None or row[1] <= now:
+            return None
+        return json.loads(row[0])
+
+    def _disk_set(self, key, value, now):
+        if self._disk is None:
+            return
+        try:
+            with self._disk_lock:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO result_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value, default=str), now + self.ttl_seconds)
+                )
+                self._disk.commit()
+            if now - self._last_prune >= self.prune_interval_seconds:
+                self._prune()
+        except sqlite3.Error as e:
+            print(f"Result cache disk write failed: {e}")
+
+    def _prune(self):
+        """Drop expired rows, then the soonest-expiring ones until the namespace fits `disk_max_bytes`."""
+        now = time.time()
+        self._last_prune = now
+        with self._disk_lock:
+            removed = self._disk.execute(
+                "DELETE FROM result_cache WHERE namespace = ? AND expires_at < ?", (self.namespace, now)
+            ).rowcount
+            total = self._disk.execute(
+                "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM result_cache WHERE namespace = ?",
+                (self.namespace,)
+            ).fetchone()[0]
+            if self.disk_max_bytes and total > self.disk_max_bytes:
+                excess = total - self.disk_max_bytes
+                doomed = []
+                rows = self._disk.execute(
+                    "SELECT key, LENGTH(value) FROM result_cache WHERE namespace = ? ORDER BY expires_at",
+                    (self.namespace,)
+                )
+                for key, size in rows:
+                    if excess <= 0:
+                        break
+                    doomed.append((self.namespace, key))
+                    excess -= size
+                self._disk.executemany("DELETE FROM result_cache WHERE namespace = ? AND key = ?", doomed)
+                removed += len(doomed)
+            self._disk.commit()
+        self.disk_pruned += removed
+
+    def close(self):
+        if self._disk_executor is not None:
+            # Let queued writes land before closing the connection
+            self._disk_executor.shutdown(wait=True)
+            self._disk_executor = None
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def get_stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_enabled": self._disk is not None,
+            "disk_max_bytes": self.disk_max_bytes,
+            "disk_pruned": self.disk_pruned,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else None,
+        }
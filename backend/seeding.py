@@ -0,0 +1,77 @@
+import csv
+import hashlib
+import io
+import os
+from pymongo import UpdateOne
+
+POLICE_STATIONS_CSV = os.path.join(os.path.dirname(__file__), '..', 'police_stations', 'policestations.csv')
+DEFAULT_STATION_PASSWORD = "default_password"
+
+
+def seed_police_stations(db, hash_password, csv_file_path=POLICE_STATIONS_CSV):
+    """
+    Insert police stations from the CSV that aren't in the database yet.
+
+    The file's SHA-256 is stored in `app_meta`, so an unchanged CSV costs one
+    find_one. Otherwise existing usernames are fetched in a single query and
+    only the new stations are hashed and bulk-upserted ($setOnInsert, so a
+    concurrent seed or an existing station is never overwritten).
+    """
+    try:
+        with open(csv_file_path, mode='rb') as file:
+            content = file.read()
+    except FileNotFoundError:
+        print(f"Error: {csv_file_path} not found. Ensure the file exists and try again.")
+        return {"skipped": True, "inserted": 0}
+
+    checksum = hashlib.sha256(content).hexdigest()
+    meta = db.app_meta.find_one({"_id": "police_stations_seed"})
+    if meta and meta.get("checksum") == checksum:
+        return {"skipped": True, "inserted": 0}
+
+    stations = []
+    try:
+        for row in csv.DictReader(io.StringIO(content.decode("utf-8"))):
+            stations.append({
+                "name": row["Name of Police Station"],
+                "address": row["Address"],
+                "longitude": float(row["Longitude"]),
+                "latitude": float(row["Latitude"]),
+                "username": row["Name of Police Station"].lower().replace(" ", "_"),
+                "contact_number": row.get("Contact Number", "N/A"),  # Add contact number if present
+                "pincode": int(row["Pincode"])  # Add pincode as an integer
+            })
+    except Exception as e:
+        print(f"An error occurred while reading the CSV file: {e}")
+        return {"skipped": True, "inserted": 0}
+
+    existing = {
+        doc["username"]
+        for doc in db.police_stations.find(
+            {"username": {"$in": [station["username"] for station in stations]}},
+            {"username": 1, "_id": 0}
+        )
+    }
+
+    operations = []
+    for station in stations:
+        if station["username"] in existing:
+            continue
+        existing.add(station["username"])  # Duplicate rows in the CSV
+        station["hashed_password"] = hash_password(DEFAULT_STATION_PASSWORD)
+        operations.append(UpdateOne(
+            {"username": station["username"]},
+            {"$setOnInsert": station},
+            upsert=True
+        ))
+
+    inserted = 0
+    if operations:
+        inserted = db.police_stations.bulk_write(operations, ordered=False).upserted_count
+
+    db.app_meta.update_one(
+        {"_id": "police_stations_seed"},
+        {"$set": {"checksum": checksum}},
+        upsert=True
+    )
+    return {"skipped": False, "inserted": inserted}
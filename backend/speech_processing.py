@@ -1,29 +1,76 @@
-import requests
-from backend.config import settings
-
-def process_speech_to_text(file):
-    headers = {"authorization": settings.ASSEMBLYAI_API_KEY}
-
-    # Upload file to AssemblyAI
-    response = requests.post(
-        "https://api.assemblyai.com/v2/upload",
-        headers=headers,
-        files={"file": file.file},
-    )
-    upload_url = response.json()["upload_url"]
-
-    # Request transcription
-    transcript_request = {"audio_url": upload_url}
-    transcript_response = requests.post(
-        "https://api.assemblyai.com/v2/transcript",
-        json=transcript_request,
-        headers=headers,
-    )
-    transcript_id = transcript_response.json()["id"]
-
-    # Get transcription result
-    result = requests.get(
-        f"https://api.assemblyai.com/v2/transcript/{transcript_id}",
-        headers=headers,
-    ).json()
-    return result.get("text", "Transcription failed.")
+import asyncio
+import hashlib
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+class AudioTooLargeError(ValueError):
+    pass
+
+
+def file_sha256(fileobj, chunk_size=UPLOAD_CHUNK_SIZE):
+    """SHA-256 of a seekable file, read in chunks; leaves the file at the start."""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+class UploadStream:
+    """
+    Async iterator over an UploadFile in chunks, so only one chunk is held in
+    memory at a time. Raises AudioTooLargeError once more than `max_bytes`
+    have been read; `too_large` records that in case the HTTP client wraps
+    the error.
+    """
+
+    def __init__(self, audio_file, max_bytes, chunk_size=UPLOAD_CHUNK_SIZE):
+        self.audio_file = audio_file
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.sent = 0
+        self.too_large = False
+
+    async def __aiter__(self):
+        while True:
+            chunk = await self.audio_file.read(self.chunk_size)
+            if not chunk:
+                break
+            self.sent += len(chunk)
+            if self.sent > self.max_bytes:
+                self.too_large = True
+                raise AudioTooLargeError(f"Audio is larger than {self.max_bytes} bytes")
+            yield chunk
+
+
+async def process_speech_to_text(audio_file, owner, transcription_jobs, max_bytes, language_code="en"):
+    """
+    Start transcribing an uploaded audio file and return its TranscriptionJob.
+
+    The upload is streamed from Starlette's spooled temp file straight to
+    AssemblyAI rather than read into memory; the audio is hashed first (in a
+    thread, also in chunks) so cached or in-flight recordings are never
+    uploaded again.
+    """
+    if audio_file.size is not None and audio_file.size > max_bytes:
+        raise AudioTooLargeError(f"Audio is larger than {max_bytes} bytes")
+
+    audio_hash = None
+    if transcription_jobs.cache is not None:
+        loop = asyncio.get_running_loop()
+        audio_hash = await loop.run_in_executor(None, file_sha256, audio_file.file)
+
+    stream = UploadStream(audio_file, max_bytes)
+    try:
+        return await transcription_jobs.submit(
+            stream, owner, language_code=language_code, audio_hash=audio_hash
+        )
+    except Exception as e:
+        if stream.too_large:
+            raise AudioTooLargeError(f"Audio is larger than {max_bytes} bytes") from e
+        raise
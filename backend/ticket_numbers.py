@@ -0,0 +1,73 @@
+import asyncio
+from pymongo import ReturnDocument
+
+COUNTER_ID = "ticket_number"
+FIRST_TICKET_NUMBER = 100000  # Keeps numbers at least six digits, like the old random ones
+
+
+def format_ticket_number(number):
+    return str(number)
+
+
+def seed_ticket_counter(db):
+    """
+    Make sure the counter starts above every ticket number already issued
+    (the old random ones included). Runs once at startup; a no-op once the
+    counter exists.
+    """
+    if db.counters.find_one({"_id": COUNTER_ID}) is not None:
+        return
+    highest = FIRST_TICKET_NUMBER - 1
+    for row in db.tickets.aggregate([
+        {"$match": {"ticket_number": {"$regex": "^[0-9]+$"}}},
+        {"$group": {"_id": None, "highest": {"$max": {"$toLong": "$ticket_number"}}}},
+    ]):
+        highest = max(highest, row["highest"])
+    # $max so a concurrently started worker can't move the counter backwards
+    db.counters.update_one({"_id": COUNTER_ID}, {"$max": {"value": highest}}, upsert=True)
+
+
+class TicketNumberAllocator:
+    """
+    Hands out unique ticket numbers from a counter document.
+
+    Each worker reserves a block of `block_size` numbers with one atomic
+    find_one_and_update and then serves them from memory, so most tickets
+    cost no round-trip at all. Numbers left in a block when the worker stops
+    are skipped, which leaves gaps but never duplicates.
+    """
+
+    def __init__(self, counters, block_size=20):
+        self.counters = counters  # Motor collection
+        self.block_size = max(1, block_size)
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+
+        # Metrics
+        self.allocated = 0
+        self.blocks_reserved = 0
+
+    async def next(self):
+        async with self._lock:
+            if self._next >= self._end:
+                counter = await self.counters.find_one_and_update(
+                    {"_id": COUNTER_ID},
+                    {"$inc": {"value": self.block_size}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                self._end = counter["value"] + 1
+                self._next = self._end - self.block_size
+                self.blocks_reserved += 1
+            number = self._next
+            self._next += 1
+            self.allocated += 1
+        return format_ticket_number(number)
+
+    def get_stats(self):
+        return {
+            "allocated": self.allocated,
+            "blocks_reserved": self.blocks_reserved,
+            "remaining_in_block": self._end - self._next,
+        }
@@ -0,0 +1,271 @@
+import asyncio
+import json
+import time
+import uuid
+from backend.assemblyai_client import TranscriptionError
+
+
+class TranscriptionJob:
+    __slots__ = ("id", "owner", "transcript_id", "status", "text", "crime_analysis",
+                 "error", "created_at", "finished_at", "done", "cache_key", "cached")
+
+    def __init__(self, owner):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.transcript_id = None
+        self.status = "queued"
+        self.text = None
+        self.crime_analysis = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.done = asyncio.Event()
+        self.cache_key = None
+        self.cached = False
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "transcription": self.text,
+            "crime_analysis": self.crime_analysis,
+            "error": self.error,
+            "cached": self.cached,
+        }
+
+
+class TranscriptionJobManager:
+    """
+    Tracks speech-to-text jobs so /process-speech can return straight away.
+
+    The audio is uploaded and submitted with a `webhook_url`; AssemblyAI calls
+    /assemblyai-webhook when it is done and `complete()` fetches the text and
+    wakes everyone waiting on the job. Without a public webhook URL (local
+    development) each job falls back to polling in a background task.
+
+    Jobs live in this process only, so run a single worker or route webhook
+    and result requests back to the same one. With several workers a webhook
+    may land on one that doesn't own the job; the owner then picks the
+    result up by polling once `webhook_fallback_seconds` have passed without
+    a callback. Finished jobs are dropped after `job_ttl_seconds`.
+
+    With a ResultCache, transcripts are stored under the SHA-256 of the audio
+    plus the language code: a repeat upload completes immediately, and an
+    upload identical to one still in flight waits on that transcription
+    instead of paying for a second one.
+    """
+
+    def __init__(self, assemblyai, webhook_url=None, webhook_secret=None,
+                 job_ttl_seconds=3600, analyze_text=None, cache=None, webhook_fallback_seconds=60.0):
+        self.assemblyai = assemblyai
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.webhook_fallback_seconds = webhook_fallback_seconds
+        self.job_ttl_seconds = job_ttl_seconds
+        self.analyze_text = analyze_text
+        self._jobs = {}
+        self._by_transcript = {}
+        self._poll_tasks = {}  # job id -> polling task
+        self.cache = cache
+        self._in_flight = {}  # cache key -> jobs waiting on the same transcription
+
+        # Metrics
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.webhooks = 0
+
+    async def submit(self, audio, owner, language_code="en", audio_hash=None):
+        """
+        Upload the audio (bytes or an async iterator of chunks), start the
+        transcription and return the job. `audio_hash` (SHA-256 hex of the
+        audio) enables the cache; without it every upload is transcribed.
+        """
+        self._expire()
+        job = TranscriptionJob(owner)
+
+        if self.cache is not None and audio_hash:
+            job.cache_key = f"sha256:{audio_hash}:{language_code}"
+            cached = await self.cache.aget(job.cache_key)
+            if cached is not None:
+                self._jobs[job.id] = job
+                job.cached = True
+                self.cache_hits += 1
+                self._finish(job, cached)
+                return job
+            waiting = self._in_flight.get(job.cache_key)
+            if waiting is not None:
+                # Someone is already transcribing this exact recording
+                self._jobs[job.id] = job
+                job.status = "processing"
+                waiting.append(job)
+                self.coalesced += 1
+                return job
+            self._in_flight[job.cache_key] = [job]
+
+        try:
+            return await self._start(job, audio, language_code)
+        except Exception:
+            for follower in self._waiting_on(job)[1:]:
+                self._fail(follower, "Transcription failed")
+            raise
+
+    async def _start(self, job, audio, language_code):
+        upload_url = await self.assemblyai.upload(audio)
+        options = {}
+        if self.webhook_url:
+            options["webhook_url"] = self.webhook_url
+            if self.webhook_secret:
+                options["webhook_auth_header_name"] = "X-Webhook-Secret"
+                options["webhook_auth_header_value"] = self.webhook_secret
+        job.transcript_id = await self.assemblyai.submit(upload_url, language_code, **options)
+        job.status = "processing"
+
+        self._jobs[job.id] = job
+        self._by_transcript[job.transcript_id] = job
+        self.submitted += 1
+
+        # Without a webhook poll right away; with one, only if the callback never reaches us
+        delay = self.webhook_fallback_seconds if self.webhook_url else 0
+        task = asyncio.create_task(self._poll(job, delay))
+        self._poll_tasks[job.id] = task
+        task.add_done_callback(lambda _: self._poll_tasks.pop(job.id, None))
+        return job
+
+    async def _poll(self, job, delay=0):
+        try:
+            if delay:
+                try:
+                    await asyncio.wait_for(job.done.wait(), delay)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+            result = await self.assemblyai.wait_for_transcript(job.transcript_id)
+            if job.done.is_set():
+                return
+            self._finish(job, result)
+        except TranscriptionError as e:
+            self._fail(job, str(e))
+        except Exception as e:
+            print(f"Polling transcript {job.transcript_id} failed: {e}")
+            self._fail(job, "Transcription failed")
+
+    async def complete(self, transcript_id, status):
+        """Webhook entry point. Returns False for transcripts we don't know about."""
+        job = self._by_transcript.get(transcript_id)
+        if job is None or job.done.is_set():
+            return False
+        self.webhooks += 1
+
+        # The webhook only carries the status; the text (or error) has to be fetched once
+        if status in ("completed", "error"):
+            self._finish(job, await self.assemblyai.get_transcript(transcript_id))
+        return True
+
+    def _finish(self, job, result):
+        # The webhook and the fallback poll can both deliver a result; the first one wins
+        if job.done.is_set():
+            return
+        if result.get("status") != "completed":
+            self._fail(job, "Transcription failed: " + result.get("error", "Unknown error"))
+            return
+
+        self._stop_polling(job)
+        text = result.get("text") or ""
+        if self.cache is not None and job.cache_key and not job.cached:
+            self.cache.set(job.cache_key, {"status": "completed", "text": text})
+
+        for waiting_job in self._waiting_on(job):
+            waiting_job.text = text
+            if self.analyze_text:
+                waiting_job.crime_analysis = self.analyze_text(text)
+            waiting_job.status = "completed"
+            waiting_job.finished_at = time.time()
+            waiting_job.done.set()
+            self.completed += 1
+
+    def _fail(self, job, error):
+        if job.done.is_set():
+            return
+        self._stop_polling(job)
+        for waiting_job in self._waiting_on(job):
+            waiting_job.status = "error"
+            waiting_job.error = error
+            waiting_job.finished_at = time.time()
+            waiting_job.done.set()
+            self.failed += 1
+
+    def _stop_polling(self, job):
+        """Cancel the job's polling task, unless that task is the one finishing it."""
+        task = self._poll_tasks.pop(job.id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    def _waiting_on(self, job):
+        """The job plus any identical uploads coalesced onto it."""
+        waiting = self._in_flight.get(job.cache_key)
+        if waiting and waiting[0] is job:
+            return self._in_flight.pop(job.cache_key)
+        return [job]
+
+    def get(self, job_id, owner):
+        job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    async def wait(self, job, timeout):
+        """Long-poll: return once the job is done or `timeout` seconds have passed."""
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job.to_dict()
+
+    async def events(self, job, keepalive_seconds=15):
+        """Server-sent events: status now, a keep-alive comment while waiting, then the result."""
+        yield f"event: status\ndata: {json.dumps(job.to_dict())}\n\n"
+        while not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+        yield f"event: result\ndata: {json.dumps(job.to_dict())}\n\n"
+
+    def _expire(self):
+        now = time.time()
+        for job in list(self._jobs.values()):
+            if job.done.is_set():
+                expired = now - job.finished_at > self.job_ttl_seconds
+            else:
+                # AssemblyAI never called back; give up on it
+                expired = now - job.created_at > 2 * self.job_ttl_seconds
+                if expired:
+                    self._fail(job, "Transcription timed out")
+            if expired:
+                del self._jobs[job.id]
+                self._by_transcript.pop(job.transcript_id, None)
+
+    async def stop(self):
+        tasks = list(self._poll_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.cache is not None:
+            self.cache.close()
+
+    def get_stats(self):
+        return {
+            "mode": "webhook" if self.webhook_url else "polling",
+            "jobs": len(self._jobs),
+            "pending": sum(1 for job in self._jobs.values() if not job.done.is_set()),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "webhooks": self.webhooks,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+        }
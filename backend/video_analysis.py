@@ -0,0 +1,167 @@
+import os
+import tempfile
+import time
+import av
+import numpy as np
+from backend.config import settings
+from backend.crime_detection import model_registry
+
+
+class FrameSampler:
+    """
+    Adaptive frame sampling for evidence clips.
+
+    A frame is kept when it differs enough from the last kept frame (mean
+    absolute difference of small grayscale thumbnails, 0..1), but never more
+    often than `min_interval` seconds; a frame is always kept after
+    `max_interval` seconds so static scenes are still checked now and then.
+    """
+
+    def __init__(self, scene_change_threshold=0.12, min_interval=0.5, max_interval=5.0):
+        self.scene_change_threshold = scene_change_threshold
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._last_time = None
+        self._last_thumbnail = None
+
+    def should_sample(self, timestamp, thumbnail):
+        if self._last_time is None:
+            return self._keep(timestamp, thumbnail)
+
+        elapsed = timestamp - self._last_time
+        if elapsed < self.min_interval:
+            return False
+        if elapsed >= self.max_interval:
+            return self._keep(timestamp, thumbnail)
+
+        change = np.abs(thumbnail.astype(np.int16) - self._last_thumbnail).mean() / 255
+        if change >= self.scene_change_threshold:
+            return self._keep(timestamp, thumbnail)
+        return False
+
+    def _keep(self, timestamp, thumbnail):
+        self._last_time = timestamp
+        self._last_thumbnail = thumbnail.astype(np.int16)
+        return True
+
+
+def iter_frames(source):
+    """Decode video frames one at a time as (timestamp_seconds, frame)."""
+    with av.open(source) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        rate = float(stream.average_rate or 25)
+        for index, frame in enumerate(container.decode(stream)):
+            timestamp = frame.time if frame.time is not None else index / rate
+            yield timestamp, frame
+
+
+def analyze_video(source, detector, batch_size=8, max_frames=120, early_exit_crime="Armed Threat",
+                  early_exit_score=0.9, sampler=None, deadline=None):
+    """
+    Run sampled frames of a video through `detector` in batches.
+    Stops as soon as a frame has a detection mapping to `early_exit_crime`
+    with a score of at least `early_exit_score`, or once the wall-clock
+    `deadline` (time.time()) passes, in which case `timed_out` is set and
+    only the frames analyzed so far count.
+    """
+    sampler = sampler or FrameSampler()
+    pending = []
+    frames = []
+    frames_decoded = 0
+    early_exit = False
+    timed_out = False
+
+    def flush():
+        images = [image for _, image in pending]
+        for (timestamp, _), result in zip(pending, detector.detect_crime_images(images)):
+            frames.append({"timestamp": round(timestamp, 3), **result})
+        pending.clear()
+        return any(
+            detection["score"] >= early_exit_score
+            and early_exit_crime in detector.keyword_index.crime_types([detection["label"]])
+            for frame in frames[-len(images):]
+            for detection in frame["detections"]
+        )
+
+    for timestamp, frame in iter_frames(source):
+        if deadline is not None and time.time() >= deadline:
+            timed_out = True
+            pending.clear()
+            break
+        frames_decoded += 1
+        thumbnail = frame.to_ndarray(width=32, height=18, format="gray")
+        if not sampler.should_sample(timestamp, thumbnail):
+            continue
+
+        # Let libswscale scale straight to the model input size instead of building a full-size image
+        height, width = detector.preprocessor.target_size(frame.width, frame.height)
+        pending.append((timestamp, frame.to_image(width=width, height=height)))
+
+        if len(pending) >= batch_size and flush():
+            early_exit = True
+            break
+        if len(frames) + len(pending) >= max_frames:
+            break
+
+    if pending and not early_exit:
+        early_exit = flush()
+
+    keywords = sorted({keyword for frame in frames for keyword in frame["keywords"]})
+    if early_exit:
+        crime_type = early_exit_crime
+    else:
+        crime_type = detector.keyword_index.classify(keywords)
+
+    return {
+        "keywords": keywords,
+        "crime_type": crime_type,
+        "early_exit": early_exit,
+        "timed_out": timed_out,
+        "frames_decoded": frames_decoded,
+        "frames_analyzed": len(frames),
+        "frames": frames
+    }
+
+
+def spool_to_temp_file(fileobj, max_bytes, chunk_size=1024 * 1024):
+    """
+    Copy an uploaded file to a named temp file in chunks so worker processes can open it.
+    Raises ValueError once more than `max_bytes` have been copied.
+    """
+    handle, path = tempfile.mkstemp(suffix=".video")
+    copied = 0
+    try:
+        with os.fdopen(handle, "wb") as output:
+            while True:
+                chunk = fileobj.read(chunk_size)
+                if not chunk:
+                    break
+                copied += len(chunk)
+                if copied > max_bytes:
+                    raise ValueError(f"Video is larger than {max_bytes} bytes")
+                output.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def analyze_video_file(path, deadline=None):
+    """
+    Analyze a video on disk with the shared detector, using the configured sampling.
+    """
+    return analyze_video(
+        path,
+        model_registry.get_detector(),
+        batch_size=settings.BATCH_MAX_SIZE,
+        max_frames=settings.VIDEO_MAX_FRAMES,
+        early_exit_crime=settings.VIDEO_EARLY_EXIT_CRIME,
+        early_exit_score=settings.VIDEO_EARLY_EXIT_SCORE,
+        sampler=FrameSampler(
+            scene_change_threshold=settings.VIDEO_SCENE_CHANGE_THRESHOLD,
+            min_interval=settings.VIDEO_MIN_SAMPLE_INTERVAL_SECONDS,
+            max_interval=settings.VIDEO_MAX_SAMPLE_INTERVAL_SECONDS
+        ),
+        deadline=deadline
+    )
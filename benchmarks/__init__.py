@@ -0,0 +1 @@
+#to treat benchmarks. as a package.
\ No newline at end of file
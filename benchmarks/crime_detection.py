@@ -0,0 +1,201 @@
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+import torch
+from PIL import Image, ImageDraw
+from backend.crime_detection import CrimeDetector
+from backend.model_registry import current_rss_bytes
+
+# python -m benchmarks.crime_detection --output bench.json [--baseline previous.json]
+
+DEFAULT_RESOLUTIONS = ["640x480", "1920x1080", "4032x3024"]
+DEFAULT_BATCH_SIZES = [1, 4, 8]
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far (None if unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def synthetic_jpeg(width, height, seed):
+    """A JPEG with random shapes on a gradient, roughly as compressible as a photo."""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, width, dtype=np.uint8)
+    pixels = np.stack([np.tile(gradient, (height, 1))] * 3, axis=-1)
+    pixels[..., int(rng.integers(3))] = rng.integers(0, 255, dtype=np.uint8)
+    image = Image.fromarray(pixels)
+
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x0, y0 = int(rng.integers(width)), int(rng.integers(height))
+        x1 = min(width, x0 + int(rng.integers(width // 10, width // 3)))
+        y1 = min(height, y0 + int(rng.integers(height // 10, height // 3)))
+        colour = tuple(int(c) for c in rng.integers(0, 255, size=3))
+        if rng.random() < 0.5:
+            draw.rectangle([x0, y0, x1, y1], fill=colour)
+        else:
+            draw.ellipse([x0, y0, x1, y1], fill=colour)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def summarize(samples_ms):
+    values = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+    }
+
+
+def run_case(detector, corpus, batch_size, iterations, warmup):
+    preprocess_ms = []
+    forward_ms = []
+    postprocess_ms = []
+    total_ms = []
+    images_done = 0
+
+    for iteration in range(warmup + iterations):
+        batch = [corpus[(iteration * batch_size + i) % len(corpus)] for i in range(batch_size)]
+
+        started = time.perf_counter()
+        images = [detector.preprocessor.load(image_bytes) for image_bytes in batch]
+        pixel_values = detector.preprocess(images)
+        preprocessed = time.perf_counter()
+
+        logits, pred_boxes = detector.backend(pixel_values)
+        forwarded = time.perf_counter()
+
+        for detections in detector.post_process(logits, pred_boxes):
+            detector._classify_detections(detections)
+        finished = time.perf_counter()
+
+        if iteration < warmup:
+            continue
+        preprocess_ms.append(1000 * (preprocessed - started))
+        forward_ms.append(1000 * (forwarded - preprocessed))
+        postprocess_ms.append(1000 * (finished - forwarded))
+        total_ms.append(1000 * (finished - started))
+        images_done += batch_size
+
+    return {
+        "preprocess_ms": summarize(preprocess_ms),
+        "forward_ms": summarize(forward_ms),
+        "postprocess_ms": summarize(postprocess_ms),
+        "batch_total_ms": summarize(total_ms),
+        "throughput_images_per_second": round(images_done / (sum(total_ms) / 1000), 3),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(resolutions, batch_sizes, iterations, warmup, corpus_size, backend=None):
+    rss_before = current_rss_bytes()
+    started = time.perf_counter()
+    detector = CrimeDetector(backend=backend)
+    load_seconds = time.perf_counter() - started
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "torch_threads": torch.get_num_threads(),
+            "cpu_count": os.cpu_count(),
+            "backend": detector.backend.name,
+            "input_size": list(detector.input_size) if detector.input_size else None,
+            "iterations": iterations,
+            "warmup": warmup,
+        },
+        "model_load": {
+            "seconds": round(load_seconds, 3),
+            "rss_delta_bytes": (
+                current_rss_bytes() - rss_before if rss_before is not None else None
+            ),
+        },
+        "cases": [],
+    }
+
+    for resolution in resolutions:
+        width, height = (int(part) for part in resolution.lower().split("x"))
+        corpus = [synthetic_jpeg(width, height, seed) for seed in range(corpus_size)]
+        for batch_size in batch_sizes:
+            case = run_case(detector, corpus, batch_size, iterations, warmup)
+            report["cases"].append({"resolution": resolution, "batch_size": batch_size, **case})
+            print(
+                f"{resolution:>10} batch={batch_size:<3} "
+                f"forward p50={case['forward_ms']['p50']:.1f}ms "
+                f"p95={case['forward_ms']['p95']:.1f}ms "
+                f"throughput={case['throughput_images_per_second']:.2f} img/s",
+                file=sys.stderr
+            )
+    return report
+
+
+def compare(report, baseline):
+    """Print throughput and p95 forward latency relative to an earlier report."""
+    previous = {(case["resolution"], case["batch_size"]): case for case in baseline["cases"]}
+    print(f"Compared with {baseline['meta'].get('commit')}:", file=sys.stderr)
+    for case in report["cases"]:
+        old = previous.get((case["resolution"], case["batch_size"]))
+        if not old:
+            continue
+        throughput = case["throughput_images_per_second"] / old["throughput_images_per_second"]
+        latency = case["forward_ms"]["p95"] / old["forward_ms"]["p95"]
+        print(
+            f"{case['resolution']:>10} batch={case['batch_size']:<3} "
+            f"throughput x{throughput:.3f}  forward p95 x{latency:.3f}",
+            file=sys.stderr
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the crime-detection pipeline")
+    parser.add_argument("--resolutions", nargs="+", default=DEFAULT_RESOLUTIONS)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--corpus-size", type=int, default=8)
+    parser.add_argument("--backend", default=None, help="Override INFERENCE_BACKEND")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        args.resolutions, args.batch_sizes, args.iterations, args.warmup, args.corpus_size, args.backend
+    )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            compare(report, json.load(baseline))
@@ -0,0 +1,23 @@
+import os
+
+# main.py builds its settings and app at import time; give it a config that needs no services
+for name, value in {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "ASSEMBLY_API_KEY": "test",
+    "GEMINI_API_KEY": "test",
+    "FOLDER_ID": "test",
+    "SECRET_KEY": "test-secret",
+    "SMTP_EMAIL": "test@example.com",
+    "SMTP_PASSWORD": "test",
+    "SMTP_SERVER": "localhost",
+    "SMTP_PORT": "25",
+    "EMAIL_HOST": "localhost",
+    "EMAIL_PORT": "25",
+    "EMAIL_USERNAME": "test",
+    "EMAIL_PASSWORD": "test",
+    "EMAIL_FROM": "test@example.com",
+    "TTL_STORE_BACKEND": "memory",
+    "TRANSCRIPTION_CACHE_ENABLED": "false",
+    "RATE_LIMIT_ENABLED": "false",
+}.items():
+    os.environ.setdefault(name, value)
@@ -1,21 +1,38 @@
 import uuid
-import random
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, status, Body, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, status, Body, Form, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 from fastapi import Form
-from backend.crime_detection import analyze_image_detailed
-from backend.speech_processing import process_speech_to_text
-from backend.database import Database
+from backend.crime_detection import model_registry, text_keyword_index
+from backend.inference_pool import InferencePool
+from backend.result_cache import ResultCache
+from backend.image_preprocessing import check_image_limits, ImageTooLargeError
+from backend.video_analysis import spool_to_temp_file
+from backend.http_client import HttpClient
+from backend.assemblyai_client import AssemblyAIClient, TranscriptionError
+from backend.transcription_jobs import TranscriptionJobManager
+from backend.speech_processing import process_speech_to_text, AudioTooLargeError
+from backend.async_database import AsyncDatabase
+from backend.auth_cache import PrincipalCache
+from backend.password_hashing import PasswordHasherBusy
+from backend.refresh_tokens import RefreshTokenError
+from backend.kv_store import create_ttl_store
+from backend.rate_limit import TokenBucketLimiter, RateLimitPolicy, RateLimitMiddleware
+from backend.indexes import ensure_indexes, IndexReportCache
+from backend.pagination import (
+    fetch_page, ticket_filters, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
+    POLICE_TICKET_LIST_PROJECTION, USER_TICKET_LIST_PROJECTION
+)
+from backend.seeding import seed_police_stations
+from backend.ticket_numbers import seed_ticket_counter
 from backend.models import CrimeReport, PoliceStation, User, Ticket
-from typing import List, Optional, Dict
+from typing import List, Optional
 from backend.config import settings
 from fastapi import HTTPException
 from fastapi.responses import HTMLResponse
@@ -23,8 +40,6 @@ from bson import ObjectId
 from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
 import os
-from backend.database import Database
-import aiohttp
 import asyncio
 from googleapiclient.http import MediaIoBaseUpload,MediaIoBaseDownload
 import io
@@ -37,10 +52,112 @@ import hashlib
 from dotenv import load_dotenv
 from fastapi.responses import JSONResponse
 import pytz
+from contextlib import asynccontextmanager
+
+
+# Crime detection runs in dedicated worker processes, away from the event loop
+inference_pool = InferencePool(
+    workers=settings.INFERENCE_WORKERS,
+    queue_size=settings.INFERENCE_QUEUE_SIZE,
+    timeout_seconds=settings.INFERENCE_TIMEOUT_SECONDS,
+    max_batch_size=settings.BATCH_MAX_SIZE,
+    max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+    torch_threads=settings.INFERENCE_TORCH_THREADS,
+    warm_up=settings.WARM_UP_MODELS,
+    cache=ResultCache(
+        "image_analysis_v3",  # v3: no cross-image padding in batches (v2 could hold skewed boxes)
+        max_entries=settings.IMAGE_CACHE_MAX_ENTRIES,
+        max_bytes=settings.IMAGE_CACHE_MAX_BYTES,
+        ttl_seconds=settings.IMAGE_CACHE_TTL_SECONDS,
+        disk_path=settings.IMAGE_CACHE_DISK_PATH,
+        disk_max_bytes=settings.IMAGE_CACHE_DISK_MAX_BYTES
+    ) if settings.IMAGE_CACHE_ENABLED else None,
+    perceptual_cache=settings.IMAGE_CACHE_PERCEPTUAL_HASH,
+    video_timeout_seconds=settings.VIDEO_TIMEOUT_SECONDS
+)
+
+# One pooled HTTP session for all outbound API calls
+http_client = HttpClient(
+    pool_size=settings.HTTP_POOL_SIZE,
+    pool_size_per_host=settings.HTTP_POOL_SIZE_PER_HOST,
+    connect_timeout=settings.HTTP_CONNECT_TIMEOUT_SECONDS
+)
+assemblyai = AssemblyAIClient(
+    http_client,
+    settings.ASSEMBLY_API_KEY,
+    base_url=settings.ASSEMBLYAI_BASE_URL,
+    timeout_seconds=settings.TRANSCRIPTION_TIMEOUT_SECONDS,
+    min_poll_interval=settings.TRANSCRIPTION_MIN_POLL_SECONDS,
+    max_poll_interval=settings.TRANSCRIPTION_MAX_POLL_SECONDS
+)
+# Every worker has to accept webhooks for jobs any of them submitted, so the secret can't be per process
+if settings.PUBLIC_BASE_URL and not settings.ASSEMBLYAI_WEBHOOK_SECRET:
+    raise RuntimeError("ASSEMBLYAI_WEBHOOK_SECRET must be set when PUBLIC_BASE_URL enables the AssemblyAI webhook")
+
+# AssemblyAI calls us back when a transcript is ready; polling is only the fallback
+transcription_jobs = TranscriptionJobManager(
+    assemblyai,
+    webhook_url=(
+        settings.PUBLIC_BASE_URL.rstrip("/") + "/assemblyai-webhook" if settings.PUBLIC_BASE_URL else None
+    ),
+    webhook_secret=settings.ASSEMBLYAI_WEBHOOK_SECRET or secrets.token_urlsafe(32),
+    job_ttl_seconds=settings.TRANSCRIPTION_JOB_TTL_SECONDS,
+    webhook_fallback_seconds=settings.TRANSCRIPTION_WEBHOOK_FALLBACK_SECONDS,
+    analyze_text=text_keyword_index.score_text,
+    cache=ResultCache(
+        "transcriptions",
+        max_entries=settings.TRANSCRIPTION_CACHE_MAX_ENTRIES,
+        max_bytes=settings.TRANSCRIPTION_CACHE_MAX_BYTES,
+        ttl_seconds=settings.TRANSCRIPTION_CACHE_TTL_SECONDS,
+        disk_path=settings.TRANSCRIPTION_CACHE_DISK_PATH,
+        disk_max_bytes=settings.TRANSCRIPTION_CACHE_DISK_MAX_BYTES
+    ) if settings.TRANSCRIPTION_CACHE_ENABLED else None
+)
 
+# OTPs and other short-lived state; the sqlite backend is shared by all workers on the host
+ttl_store = create_ttl_store(
+    settings.TTL_STORE_BACKEND,
+    path=settings.TTL_STORE_PATH,
+    sweep_interval=settings.TTL_STORE_SWEEP_SECONDS
+)
 
-app = FastAPI()
-db = Database()
+# Result of the startup index check, reported on /metrics
+index_status = {}
+index_reports = IndexReportCache(ttl_seconds=settings.INDEX_REPORT_CACHE_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm the crime detector before serving requests
+    await inference_pool.start()
+    await http_client.start()
+    await ttl_store.start()
+    # One MongoClient and connection pool for the whole app; routes get it through get_db
+    db = app.state.db = AsyncDatabase()
+    # Create any missing MongoDB indexes (a no-op once they exist)
+    loop = asyncio.get_running_loop()
+    index_status.update(await loop.run_in_executor(None, ensure_indexes, db.sync_db))
+    # Seed police stations from the CSV; skipped when the file hasn't changed
+    await loop.run_in_executor(None, seed_police_stations, db.sync_db, db.hash_password)
+    # Start ticket numbers above any issued before the counter existed
+    await loop.run_in_executor(None, seed_ticket_counter, db.sync_db)
+    yield
+    await transcription_jobs.stop()
+    await http_client.close()
+    await ttl_store.stop()
+    await inference_pool.stop()
+    db.close()
+
+
+def get_db(request: Request) -> AsyncDatabase:
+    return request.app.state.db
+
+
+app = FastAPI(lifespan=lifespan)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # Shed auth load instead of queueing bcrypt work without bound
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 # Serve the frontend directory
 frontend_path = "frontend"
@@ -72,9 +189,35 @@ app.mount("/uploads", StaticFiles(directory=uploads_path), name="uploads")
 def read_root():
     return {"message": "Welcome to the root!"}
 
+@app.get("/metrics")
+def get_metrics(db: AsyncDatabase = Depends(get_db)):
+    # Runtime statistics used for capacity planning
+    return {
+        "model": model_registry.get_stats(),
+        "inference": inference_pool.get_stats(),
+        "http": http_client.get_stats(),
+        "transcription": {**assemblyai.get_stats(), "jobs": transcription_jobs.get_stats()},
+        "mongo_pool": db.get_pool_stats(),
+        "ticket_numbers": db.ticket_numbers.get_stats(),
+        "auth_cache": principal_cache.get_stats(),
+        "password_hashing": db.password_hasher.get_stats(),
+        "refresh_tokens": db.refresh_tokens.get_stats(),
+        "ttl_store": ttl_store.get_stats(),
+        "rate_limit": {
+            **rate_limiter.get_stats(),
+            "enabled": settings.RATE_LIMIT_ENABLED,
+            "policies": {policy.name: policy.get_stats() for policy in rate_limit_policies},
+        },
+        "indexes": {**index_status, "report": index_reports.get(db.sync_db)}
+    }
+
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Verified tokens -> user / police station documents, so repeat requests skip JWT decoding and Mongo
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS
+)
 
 
 # Function to convert ObjectId fields to strings
@@ -85,6 +228,44 @@ def convert_objectid_to_str(data):
         return {k: str(v) if isinstance(v, ObjectId) else v for k, v in data.items()}
     return data
 
+# Throttling for endpoints that cost SMTP, bcrypt, Drive or model time
+rate_limiter = TokenBucketLimiter(max_buckets=settings.RATE_LIMIT_MAX_BUCKETS)
+rate_limit_policies = [
+    RateLimitPolicy("otp", "ip", per_minute=3, burst=5, paths=["/send-otp", "/verify-otp"]),
+    RateLimitPolicy("otp_global", "route", per_minute=60, paths=["/send-otp"]),  # Caps total SMTP sends
+    RateLimitPolicy("login", "ip", per_minute=10, paths=["/login", "/police-login", "/token"]),
+    RateLimitPolicy("account", "ip", per_minute=5, paths=["/signup", "/reset-password"]),
+    RateLimitPolicy("refresh", "ip", per_minute=30, paths=["/token/refresh"]),
+    RateLimitPolicy("upload", "user", per_minute=6, burst=3, paths=["/upload-crime-report"]),
+    RateLimitPolicy(
+        "analysis", "user", per_minute=30, burst=10,
+        paths=["/analyze-image", "/analyze-video", "/process-speech"]
+    ),
+    RateLimitPolicy("api", "ip", per_minute=600, burst=200, methods=None),  # Everything, per client
+]
+
+
+def rate_limit_subject(authorization: Optional[str]) -> Optional[str]:
+    """The `sub` of a valid bearer token, so authenticated callers are limited per account."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+# Added before CORS so that 429 responses still carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=rate_limiter,
+        policies=rate_limit_policies,
+        identify_user=rate_limit_subject,
+        trust_forwarded_for=settings.RATE_LIMIT_TRUST_FORWARDED_FOR
+    )
+
 # CORS Middleware - Updated Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -110,9 +291,6 @@ app.add_middleware(
 
 load_dotenv()
 
-# OTP storage
-otp_storage: Dict[str, Dict] = {}
-
 # Models for Authentication
 class UserSignup(BaseModel):
     username: str
@@ -146,7 +324,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncDatabase = Depends(get_db)):
+    user = principal_cache.get("user", token)
+    if user is not None:
+        return user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -160,9 +342,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
     
-    user = db.users_collection.find_one({"username": username})
+    user = await db.users_collection.find_one({"username": username})
     if user is None:
         raise credentials_exception
+    principal_cache.set("user", token, username, user, payload.get("exp"))
     return user
 
 # Forgot Pass functionalities.
@@ -216,15 +399,15 @@ def send_production_email(to_email: str, otp: str) -> bool:
 # Fix the email sender selection
 send_email = send_test_email if os.getenv('DEV_MODE', '').lower() == 'true' else send_production_email
 
-def is_rate_limited(email: str) -> bool:
-# Get current time in IST
-    ist = pytz.timezone('Asia/Kolkata')
-    current_time = datetime.now(ist)
-    if email in otp_storage:
-        last_attempt = otp_storage[email].get('last_attempt')
-        if last_attempt and (current_time - last_attempt) < timedelta(minutes=1):
-            return True
-    return False
+async def reserve_otp_send(email: str) -> Optional[int]:
+    """
+    Claim the right to email `email` an OTP. Returns None if allowed, or the
+    seconds to wait if one was sent within OTP_RESEND_SECONDS.
+    """
+    key = f"otp_sent:{email}"
+    if await ttl_store.aadd(key, True, settings.OTP_RESEND_SECONDS):
+        return None
+    return max(1, int(await ttl_store.attl(key) or 1))
 
 def hash_otp(otp: str, email: str) -> str:
     """Create a salted hash of the OTP."""
@@ -257,32 +440,29 @@ def send_otp_email(email: str, otp: str) -> bool:
         print(f"Error sending email: {str(e)}")
         return False
 
-def hash_password(password: str):
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
-
 # Authentication Routes
 @app.post("/send-otp")
 async def send_otp(request: EmailRequest):
     try:
-        # Get current time in IST
-        ist = pytz.timezone('Asia/Kolkata')
-        current_time = datetime.now(ist)
+        retry_after = await reserve_otp_send(request.email)
+        if retry_after is not None:
+            return JSONResponse(
+                status_code=429,
+                content={"success": False, "message": "Please wait before requesting another OTP"},
+                headers={"Retry-After": str(retry_after)}
+            )
         # Generate OTP
         otp = ''.join(secrets.choice('0123456789') for _ in range(6))
-        # Store OTP
-        otp_storage[request.email] = {
-            'otp': otp,
-            'created_at': current_time,
-            'attempts': 0
-        }
+        # Store only its hash; a new OTP replaces the old one and its attempt count
+        await ttl_store.aset(f"otp:{request.email}", hash_otp(otp, request.email), settings.OTP_TTL_SECONDS)
+        await ttl_store.adelete(f"otp_attempts:{request.email}", f"otp_verified:{request.email}")
 
         # Send OTP
         if send_production_email(request.email, otp):
             return {"success": True, "message": "OTP sent successfully"}
         else:
+            # Let the user retry straight away
+            await ttl_store.adelete(f"otp_sent:{request.email}")
             raise HTTPException(status_code=500, detail="Failed to send email")
 
     except Exception as e:
@@ -294,27 +474,20 @@ async def send_otp(request: EmailRequest):
 @app.post("/verify-otp")
 async def verify_otp(verification: OTPVerification):
     try:
-        stored = otp_storage.get(verification.email)
-        if not stored:
-            return JSONResponse(
-                status_code=400,
-                content={"success": False, "message": "No OTP request found"}
-            )
-        # Get current time in IST
-        ist = pytz.timezone('Asia/Kolkata')
-        current_time = datetime.now(ist)
-
-        if (current_time - stored['created_at']) > timedelta(minutes=5):
-            del otp_storage[verification.email]
+        otp_key = f"otp:{verification.email}"
+        attempts_key = f"otp_attempts:{verification.email}"
+        # Expired OTPs are gone from the store, so they read as missing
+        stored_hash = await ttl_store.aget(otp_key)
+        if not stored_hash:
             return JSONResponse(
                 status_code=400,
-                content={"success": False, "message": "OTP expired"}
+                content={"success": False, "message": "No OTP request found or OTP expired"}
             )
 
-        if stored['otp'] != verification.otp:
-            stored['attempts'] += 1
-            if stored['attempts'] >= 3:
-                del otp_storage[verification.email]
+        if not secrets.compare_digest(stored_hash, hash_otp(verification.otp, verification.email)):
+            attempts = await ttl_store.aincr(attempts_key, settings.OTP_TTL_SECONDS)
+            if attempts >= settings.OTP_MAX_ATTEMPTS:
+                await ttl_store.adelete(otp_key, attempts_key)
                 return JSONResponse(
                     status_code=400,
                     content={"success": False, "message": "Too many invalid attempts"}
@@ -324,6 +497,9 @@ async def verify_otp(verification: OTPVerification):
                 content={"success": False, "message": "Invalid OTP"}
             )
 
+        # An OTP verifies once; it authorizes a single password reset
+        await ttl_store.adelete(otp_key, attempts_key)
+        await ttl_store.aset(f"otp_verified:{verification.email}", True, settings.OTP_VERIFIED_TTL_SECONDS)
         return {"success": True, "message": "OTP verified successfully"}
     except Exception as e:
         return JSONResponse(
@@ -332,20 +508,17 @@ async def verify_otp(verification: OTPVerification):
         )
 
 @app.post("/reset-password")
-async def reset_password(reset_request: PasswordReset):
+async def reset_password(reset_request: PasswordReset, db: AsyncDatabase = Depends(get_db)):
     try:
         # Verify OTP was validated
-        if reset_request.email not in otp_storage:
+        if not await ttl_store.aget(f"otp_verified:{reset_request.email}"):
             raise HTTPException(
                 status_code=400, 
                 detail="Password reset not authorized. Please verify OTP first."
             )
 
-        # Initialize database connection
-        db = Database()
-        
         # Update password
-        success = db.reset_password(reset_request.email, reset_request.new_password)
+        success = await db.reset_password(reset_request.email, reset_request.new_password)
         
         if not success:
             raise HTTPException(
@@ -353,11 +526,20 @@ async def reset_password(reset_request: PasswordReset):
                 detail="User not found or password update failed"
             )
 
-        # Clean up OTP storage
-        del otp_storage[reset_request.email]
+        # Tokens resolved before the reset must not keep working from the cache
+        user = await db.users_collection.find_one({"email": reset_request.email}, {"username": 1})
+        if user:
+            principal_cache.invalidate("user", user["username"])
+            # Sign out every existing session of the account
+            await db.refresh_tokens.revoke_subject("user", user["username"])
+
+        # The verification is spent
+        await ttl_store.adelete(f"otp_verified:{reset_request.email}")
 
         return {"success": True, "message": "Password reset successful"}
     
+    except PasswordHasherBusy:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -370,8 +552,11 @@ async def reset_password(reset_request: PasswordReset):
 
 
 @app.post("/token")
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = db.authenticate_user(form_data.username, form_data.password)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncDatabase = Depends(get_db)
+):
+    user = await db.authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -382,13 +567,43 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     access_token = create_access_token(
         data={"sub": user['username']}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": access_token,
+        "refresh_token": await db.refresh_tokens.issue("user", user['username']),
+        "token_type": "bearer"
+    }
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+@app.post("/token/refresh")
+async def refresh_access_token(request: RefreshRequest, db: AsyncDatabase = Depends(get_db)):
+    # Renews a session with one HMAC and lookup instead of a bcrypt login; the refresh token rotates
+    try:
+        kind, subject, refresh_token = await db.refresh_tokens.rotate(request.refresh_token)
+    except RefreshTokenError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    collection = db.users_collection if kind == "user" else db.police_stations_collection
+    if await collection.find_one({"username": subject}, {"_id": 1}) is None:
+        await db.refresh_tokens.revoke(refresh_token)
+        raise HTTPException(status_code=401, detail="Account no longer exists")
+
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(data={"sub": subject}, expires_delta=access_token_expires)
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@app.post("/logout")
+async def logout(request: RefreshRequest, db: AsyncDatabase = Depends(get_db)):
+    # Revokes this session's refresh tokens; the access token lapses on its own
+    await db.refresh_tokens.revoke(request.refresh_token)
+    return {"success": True}
 
 @app.post("/signup")
-async def signup(user: UserSignup):
+async def signup(user: UserSignup, db: AsyncDatabase = Depends(get_db)):
     try:
-        existing_username = db.users_collection.find_one({"username": user.username})
-        existing_email = db.users_collection.find_one({"email": user.email})
+        existing_username = await db.users_collection.find_one({"username": user.username})
+        existing_email = await db.users_collection.find_one({"email": user.email})
         
         if existing_username:
             raise HTTPException(status_code=400, detail="Username already exists.")
@@ -400,7 +615,7 @@ async def signup(user: UserSignup):
         ist = pytz.timezone('Asia/Kolkata')
         current_time = datetime.now(ist)
         
-        hashed_password = hash_password(user.password)
+        hashed_password = await db.password_hasher.hash(user.password)
         user_doc = {
             "username": user.username,
             "email": user.email,
@@ -410,8 +625,10 @@ async def signup(user: UserSignup):
             "created_at": current_time,
         }
         
-        result = db.users_collection.insert_one(user_doc)
+        result = await db.users_collection.insert_one(user_doc)
         return {"message": "User created successfully", "user_id": str(result.inserted_id)}
+    except PasswordHasherBusy:
+        raise
     except Exception as e:
         print(f"Error during signup: {e}")
         raise HTTPException(status_code=500, detail="Signup failed. Please try again.")
@@ -422,7 +639,7 @@ async def options_signup():
     return {"status": "OK"}
 
 @app.post("/login")
-async def login(user: dict = Body(...)):
+async def login(user: dict = Body(...), db: AsyncDatabase = Depends(get_db)):
     username = user.get("username")
     password = user.get("password")
 
@@ -430,12 +647,12 @@ async def login(user: dict = Body(...)):
         raise HTTPException(status_code=400, detail="Username and password are required.")
 
     # Find user in the database
-    db_user = db.users_collection.find_one({"username": username})
+    db_user = await db.users_collection.find_one({"username": username})
     if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials.")
 
     # Verify the password
-    if not verify_password(password, db_user["hashed_password"]):
+    if not await db.password_hasher.verify(password, db_user["hashed_password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials.")
 
     # Generate access token
@@ -446,6 +663,7 @@ async def login(user: dict = Body(...)):
 
     return {
         "access_token": access_token,
+        "refresh_token": await db.refresh_tokens.issue("user", db_user["username"]),
         "token_type": "bearer",
         "user_id": str(db_user["_id"]),
         "success": True
@@ -454,7 +672,7 @@ async def login(user: dict = Body(...)):
 # Add this to your existing routes in main.py
 
 @app.post("/police-login")
-async def police_login(login_data: dict = Body(...)):
+async def police_login(login_data: dict = Body(...), db: AsyncDatabase = Depends(get_db)):
     station_id = login_data.get("stationId")
     station_password = login_data.get("stationPassword")
 
@@ -462,12 +680,12 @@ async def police_login(login_data: dict = Body(...)):
         raise HTTPException(status_code=400, detail="Station ID and password are required.")
 
     # Find police station in the database
-    db_station = db.police_stations_collection.find_one({"username": station_id})
+    db_station = await db.police_stations_collection.find_one({"username": station_id})
     if not db_station:
         raise HTTPException(status_code=401, detail="Invalid credentials.")
 
     # Verify the password
-    if not verify_password(station_password, db_station["hashed_password"]):
+    if not await db.password_hasher.verify(station_password, db_station["hashed_password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials.")
 
     # Generate access token using the station's username
@@ -478,6 +696,7 @@ async def police_login(login_data: dict = Body(...)):
 
     return {
         "access_token": access_token,
+        "refresh_token": await db.refresh_tokens.issue("police", db_station["username"]),
         "token_type": "bearer",
         "police_station_id": str(db_station["_id"]),
         "success": True
@@ -485,84 +704,120 @@ async def police_login(login_data: dict = Body(...)):
 
 
 @app.get("/crime-reports", response_model=List[CrimeReport])
-async def get_crime_reports(current_user: dict = Depends(get_current_user)):
+async def get_crime_reports(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncDatabase = Depends(get_db)
+):
     # Fetch crime reports for the current user
-    reports = list(db.crime_reports_collection.find({"user_id": current_user['username']}))
+    reports = await db.crime_reports_collection.find({"user_id": current_user['username']}).to_list(None)
     return reports
 
-# Speech to Text Route
-async def process_speech_to_text(audio_file: UploadFile):
-    ASSEMBLY_API_KEY = os.getenv('ASSEMBLY_API_KEY')
-    if not ASSEMBLY_API_KEY:
-        raise ValueError("API key not found. Please check your .env file.")
-    headers = {
-        'authorization': ASSEMBLY_API_KEY
-    }
-    
-    # First, upload the audio file to AssemblyAI
-    upload_endpoint = "https://api.assemblyai.com/v2/upload"
-    transcript_endpoint = "https://api.assemblyai.com/v2/transcript"
-    
-    async with aiohttp.ClientSession() as session:
-        # Read and upload the file
-        audio_data = await audio_file.read()
-        
-        async with session.post(upload_endpoint,
-                              headers=headers,
-                              data=audio_data) as upload_response:
-            if upload_response.status != 200:
-                raise HTTPException(status_code=500, detail="Failed to upload audio file")
-            
-            upload_url = (await upload_response.json())['upload_url']
-            
-        # Start transcription
-        json = {
-            "audio_url": upload_url,
-            "language_code": "en"  # You can change this for other languages
-        }
-        
-        async with session.post(transcript_endpoint,
-                              json=json,
-                              headers=headers) as transcript_response:
-            if transcript_response.status != 200:
-                raise HTTPException(status_code=500, detail="Failed to start transcription")
-            
-            transcript_id = (await transcript_response.json())['id']
-            
-        # Poll for transcription completion
-        polling_endpoint = f"https://api.assemblyai.com/v2/transcript/{transcript_id}"
-        while True:
-            await asyncio.sleep(1)
-            async with session.get(polling_endpoint, headers=headers) as polling_response:
-                polling_result = await polling_response.json()
-                
-                if polling_result['status'] == 'completed':
-                    return polling_result['text']
-                elif polling_result['status'] == 'error':
-                    raise HTTPException(status_code=500, 
-                                     detail="Transcription failed: " + polling_result.get('error', 'Unknown error'))
-                    
-                # Continue polling if status is 'queued' or 'processing'
-
-@app.post("/process-speech")
+@app.post("/analyze-image")
+async def analyze_image_endpoint(
+    image_file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    # Read at most one byte past the limit so oversized uploads are never fully buffered
+    image_bytes = await image_file.read(settings.MAX_IMAGE_UPLOAD_BYTES + 1)
+    if not image_bytes:
+        raise HTTPException(status_code=400, detail="Image file is empty")
+    try:
+        check_image_limits(image_bytes, settings.MAX_IMAGE_UPLOAD_BYTES, settings.MAX_IMAGE_PIXELS)
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Unsupported or corrupt image file")
+
+    # Falls back to 'Unspecified Crime' when the detector is busy or too slow
+    return await inference_pool.analyze(image_bytes)
+
+@app.post("/analyze-video")
+async def analyze_video_endpoint(
+    video_file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    # Copy the upload to a temp file the worker process can stream frames from
+    loop = asyncio.get_running_loop()
+    try:
+        video_path = await loop.run_in_executor(
+            None, spool_to_temp_file, video_file.file, settings.MAX_VIDEO_UPLOAD_BYTES
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        return await inference_pool.analyze_video(video_path)
+    finally:
+        os.remove(video_path)
+
+@app.post("/process-speech", status_code=202)
 async def process_speech(
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user)
 ):
     try:
-        transcription = await process_speech_to_text(file)
-        return {"transcription": transcription}
+        # Streams the upload to AssemblyAI; the transcript arrives later through the webhook
+        job = await process_speech_to_text(
+            file, current_user["username"], transcription_jobs, settings.MAX_AUDIO_UPLOAD_BYTES
+        )
+    except AudioTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except TranscriptionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/transcription-jobs/{job_id}")
+async def get_transcription_job(
+    job_id: str,
+    wait: float = 0,
+    current_user: dict = Depends(get_current_user)
+):
+    # Long-poll: ?wait=25 holds the request until the transcript is ready or 25s pass
+    job = transcription_jobs.get(job_id, current_user["username"])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Transcription job not found")
+    return await transcription_jobs.wait(job, min(max(wait, 0), 30))
+
+@app.get("/transcription-jobs/{job_id}/events")
+async def transcription_job_events(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    job = transcription_jobs.get(job_id, current_user["username"])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Transcription job not found")
+    return StreamingResponse(
+        transcription_jobs.events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/assemblyai-webhook")
+async def assemblyai_webhook(request: Request):
+    # AssemblyAI echoes back the header we registered when submitting the job
+    if not secrets.compare_digest(
+        request.headers.get("X-Webhook-Secret", ""), transcription_jobs.webhook_secret
+    ):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+    payload = await request.json()
+    try:
+        await transcription_jobs.complete(payload.get("transcript_id"), payload.get("status"))
+    except Exception as e:
+        print(f"Error handling AssemblyAI webhook: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch transcript")
+    return {"ok": True}
 
 # Police Station Routes
 @app.post("/add-police-station")
 async def add_police_station(
     station: PoliceStation, 
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncDatabase = Depends(get_db)
 ):
     # Insert police station
-    result = db.police_stations_collection.insert_one(station.dict())
+    result = await db.police_stations_collection.insert_one(station.dict())
     
     return {
         "message": "Police station added successfully", 
@@ -570,12 +825,19 @@ async def add_police_station(
     }
 
 @app.get("/police-stations", response_model=List[PoliceStation])
-async def get_police_stations(current_user: dict = Depends(get_current_user)):
+async def get_police_stations(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncDatabase = Depends(get_db)
+):
     # Fetch all police stations
-    stations = list(db.police_stations_collection.find())
+    stations = await db.police_stations_collection.find().to_list(None)
     return stations
 
-async def get_current_police_user(token: str = Depends(oauth2_scheme)):
+async def get_current_police_user(token: str = Depends(oauth2_scheme), db: AsyncDatabase = Depends(get_db)):
+    police_station = principal_cache.get("police", token)
+    if police_station is not None:
+        return police_station
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -590,24 +852,61 @@ async def get_current_police_user(token: str = Depends(oauth2_scheme)):
         raise credentials_exception
     
     # Check in police stations collection
-    police_station = db.police_stations_collection.find_one({"username": username})
+    police_station = await db.police_stations_collection.find_one({"username": username})
     if police_station is None:
         raise credentials_exception
+    principal_cache.set("police", token, username, police_station, payload.get("exp"))
     return police_station
 
 
 # Ticket Routes
+class TicketListParams:
+    """Query parameters shared by the paginated ticket lists."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        crime_type: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.filters = ticket_filters(status, crime_type, created_from, created_to)
+
+
+async def ticket_page(db, owner_filter, params, projection):
+    try:
+        page = await fetch_page(
+            db.tickets_collection,
+            {**owner_filter, **params.filters},
+            projection,
+            limit=params.limit,
+            cursor=params.cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Convert ObjectId to string for JSON serialization
+    page["items"] = convert_objectid_to_str(page["items"])
+    return page
+
+
 @app.get("/police-tickets")
-async def get_police_station_tickets(current_user: dict = Depends(get_current_police_user)):
+async def get_police_station_tickets(
+    params: TicketListParams = Depends(),
+    current_user: dict = Depends(get_current_police_user),
+    db: AsyncDatabase = Depends(get_db)
+):
     # Find the police station associated with the current user
     police_station = current_user.get('name')  # Assuming the name is stored in the user document
     if not police_station:
         raise HTTPException(status_code=403, detail="Not authorized to view tickets")
     try:
-        tickets = list(db.tickets_collection.find({"police_station": police_station}))
-        # Convert ObjectId to string for JSON serialization
-        tickets = convert_objectid_to_str(tickets)
-        return tickets
+        return await ticket_page(db, {"police_station": police_station}, params, POLICE_TICKET_LIST_PROJECTION)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching police tickets: {str(e)}")
 
@@ -616,7 +915,8 @@ async def get_police_station_tickets(current_user: dict = Depends(get_current_po
 async def update_ticket_status(
     ticket_number: str, 
     status_update: dict = Body(...), 
-    current_user: dict = Depends(get_current_police_user)
+    current_user: dict = Depends(get_current_police_user),
+    db: AsyncDatabase = Depends(get_db)
 ):
     new_status = status_update.get('status')
     if not new_status:
@@ -628,7 +928,7 @@ async def update_ticket_status(
         raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of {valid_statuses}")
     
     try:
-        updated = db.update_ticket_status(ticket_number, new_status)
+        updated = await db.update_ticket_status(ticket_number, new_status)
         if not updated:
             raise HTTPException(status_code=404, detail="Ticket not found")
         
@@ -639,11 +939,12 @@ async def update_ticket_status(
 @app.get("/ticket-details/{ticket_number}")
 async def get_ticket_details(
     ticket_number: str,
-    current_user: dict = Depends(get_current_police_user)
+    current_user: dict = Depends(get_current_police_user),
+    db: AsyncDatabase = Depends(get_db)
 ):
     try:
         # Find the ticket in the database
-        ticket = db.tickets_collection.find_one({"ticket_number": ticket_number})
+        ticket = await db.tickets_collection.find_one({"ticket_number": ticket_number})
         
         if not ticket:
             raise HTTPException(status_code=404, detail="Ticket not found")
@@ -684,7 +985,8 @@ async def read_users_me(current_user: dict = Depends(get_current_user)):
 @app.post("/create-ticket")
 async def create_ticket(
     ticket: Ticket, 
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncDatabase = Depends(get_db)
 ):
     # Get current time in IST
     ist = pytz.timezone('Asia/Kolkata')
@@ -693,20 +995,25 @@ async def create_ticket(
     ticket_data = ticket.dict()
     ticket_data['user_id'] = str(current_user['_id'])
     ticket_data['timestamp'] = current_time
+    ticket_data['ticket_number'] = await db.ticket_numbers.next()
     
     # Insert ticket
-    result = db.tickets_collection.insert_one(ticket_data)
+    result = await db.tickets_collection.insert_one(ticket_data)
     
     return {
         "message": "Ticket created successfully", 
-        "ticket_id": str(result.inserted_id)
+        "ticket_id": str(result.inserted_id),
+        "ticket_number": ticket_data['ticket_number']
     }
 
-@app.get("/tickets", response_model=List[Ticket])
-async def get_tickets(current_user: dict = Depends(get_current_user)):
+@app.get("/tickets")
+async def get_tickets(
+    params: TicketListParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncDatabase = Depends(get_db)
+):
     # Fetch tickets for the current user
-    tickets = list(db.tickets_collection.find({"user_id": current_user['username']}))
-    return tickets
+    return await ticket_page(db, {"user_id": current_user['username']}, params, USER_TICKET_LIST_PROJECTION)
 
 # --- Appended Functionality Starts Here ---
 
@@ -722,12 +1029,16 @@ async def new_feature(param1: str, param2: int):
     return {"message": f"New feature with {param1} and {param2} added successfully."}
 
 @app.get("/user-tickets")
-async def get_user_tickets(current_user: dict = Depends(get_current_user)):
+async def get_user_tickets(
+    params: TicketListParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncDatabase = Depends(get_db)
+):
     try:
         # Find tickets by username instead of user_id
-        tickets = list(db.tickets_collection.find({"user_name": current_user['username']}))
-        tickets = convert_objectid_to_str(tickets)
-        return tickets
+        return await ticket_page(db, {"user_name": current_user['username']}, params, USER_TICKET_LIST_PROJECTION)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching tickets: {str(e)}")  # Add logging
         raise HTTPException(status_code=500, detail=f"Error fetching tickets: {str(e)}")
@@ -801,15 +1112,16 @@ async def upload_crime_report(
     police_station: str = Form(...),
     crime_type: str = Form(...),
     description: str = Form(None),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncDatabase = Depends(get_db)
 ):
 
     # Ensure all required fields are present
     if not all([user_name, pincode, police_station, crime_type]):
         raise HTTPException(status_code=400, detail="Missing required fields")
 
-    # Generate a unique ticket number
-    ticket_number = str(random.randint(100000, 999999))
+    # Allocate a unique ticket number
+    ticket_number = await db.ticket_numbers.next()
 
     image_url = None
     audio_url = None
@@ -830,7 +1142,7 @@ async def upload_crime_report(
 
     # Save ticket details to the database
     try:
-        ticket = db.create_ticket(
+        ticket = await db.create_ticket(
             user_name=current_user['username'],
             pincode=pincode,
             crime_type=crime_type,
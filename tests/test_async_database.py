@@ -0,0 +1,54 @@
+import asyncio
+import time
+import httpx
+import main
+
+QUERY_SECONDS = 0.2
+
+
+class SlowCollection:
+    """Stands in for a Motor collection whose queries take QUERY_SECONDS on the server."""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def find_one(self, query, *args, **kwargs):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(QUERY_SECONDS)
+        finally:
+            self.running -= 1
+        return {"_id": "id-" + query["username"], "username": query["username"], "email": "user@example.com"}
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.users_collection = SlowCollection()
+
+
+def test_concurrent_requests_are_not_serialized_behind_one_query():
+    db = FakeDatabase()
+    main.app.state.db = db
+    tokens = [main.create_access_token({"sub": username}) for username in ("alice", "bob")]
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.get("/users/me", headers={"Authorization": f"Bearer {token}"}) for token in tokens
+            ])
+            return responses, time.perf_counter() - started
+
+    try:
+        responses, elapsed = asyncio.run(run())
+    finally:
+        del main.app.state.db
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert [response.json()["username"] for response in responses] == ["alice", "bob"]
+    # Both lookups were in flight at once: ~0.2s in total, not 0.4s
+    assert db.users_collection.max_running == 2
+    assert elapsed < 2 * QUERY_SECONDS * 0.9
@@ -0,0 +1,35 @@
+import io
+from PIL import Image
+from backend.image_hashing import perceptual_hash
+
+
+def encode(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def gradient(width=64, height=64):
+    image = Image.new("L", (width, height))
+    image.putdata([(x * 255) // (width - 1) for _ in range(height) for x in range(width)])
+    return image
+
+
+def test_flat_images_have_no_perceptual_hash():
+    assert perceptual_hash(encode(Image.new("RGB", (64, 64), "black"))) is None
+    assert perceptual_hash(encode(Image.new("RGB", (64, 64), "white"))) is None
+    # Brightness strictly increasing left to right sets every bit
+    assert perceptual_hash(encode(gradient().transpose(Image.FLIP_LEFT_RIGHT))) is None
+    assert perceptual_hash(encode(gradient())) is None
+
+
+def test_textured_image_hash_survives_resizing():
+    image = Image.new("L", (64, 64))
+    image.putdata([((x // 8) * 37 + (y // 8) * 91) % 256 for y in range(64) for x in range(64)])
+    phash = perceptual_hash(encode(image))
+    assert phash is not None and len(phash) == 16
+    assert perceptual_hash(encode(image.resize((128, 128)))) == phash
+
+
+def test_undecodable_bytes_have_no_perceptual_hash():
+    assert perceptual_hash(b"not an image") is None
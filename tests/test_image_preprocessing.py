@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from PIL import Image
+from transformers import YolosImageProcessor
+from backend.image_preprocessing import ImagePreprocessor
+
+
+@pytest.mark.parametrize("width, height", [
+    (4032, 3024),
+    (3024, 4032),
+    (1920, 1080),
+    (3000, 1000),
+    (640, 480),
+    (800, 800),
+])
+def test_target_size_matches_yolos_image_processor(width, height):
+    processor = YolosImageProcessor()
+    preprocessor = ImagePreprocessor.from_processor(processor)
+
+    image = Image.new("RGB", (width, height))
+    pixel_values = processor(images=image, return_tensors="np")["pixel_values"]
+
+    assert preprocessor.target_size(width, height) == pixel_values.shape[-2:]
+
+
+def test_fit_feeds_the_model_the_processors_input_size():
+    processor = YolosImageProcessor()
+    preprocessor = ImagePreprocessor.from_processor(processor)
+    rng = np.random.default_rng(0)
+    image = Image.fromarray(rng.integers(0, 255, size=(1080, 1920, 3), dtype=np.uint8))
+
+    expected = processor(images=image, return_tensors="np")["pixel_values"][0]
+    fitted = preprocessor.fit(image)
+
+    assert (fitted.size[1], fitted.size[0]) == expected.shape[-2:]